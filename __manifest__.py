@@ -26,14 +26,15 @@ Features:
     "data": [
         "security/ir.model.access.csv",
         "data/hr_user_roles.xml",
+        "data/ir_cron.xml",
         "views/create_user_wizard_view.xml",
+        "views/hr_user_role_view.xml",
+        "views/bulk_create_user_wizard_view.xml",
+        "views/user_provision_queue_view.xml",
+        "views/user_import_wizard_view.xml",
         "views/hr_employee_view.xml",
+        "views/password_reset_templates.xml",
     ],
-    'assets': {
-        'web.assets_backend': [
-            'user_management_module/static/src/js/block_save.js',
-        ],
-    },
     "application": False,
     "installable": True,
     "auto_install": False,
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+
+from . import build_password_filter
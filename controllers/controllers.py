@@ -1,22 +1,96 @@
 # -*- coding: utf-8 -*-
-# from odoo import http
+import csv
+import io
 
+from werkzeug.exceptions import Forbidden
 
-# class HrUserManagement(http.Controller):
-#     @http.route('/hr_user_management/hr_user_management', auth='public')
-#     def index(self, **kw):
-#         return "Hello, world"
+from odoo import http
+from odoo.http import request
 
-#     @http.route('/hr_user_management/hr_user_management/objects', auth='public')
-#     def list(self, **kw):
-#         return http.request.render('hr_user_management.listing', {
-#             'root': '/hr_user_management/hr_user_management',
-#             'objects': http.request.env['hr_user_management.hr_user_management'].search([]),
-#         })
 
-#     @http.route('/hr_user_management/hr_user_management/objects/<model("hr_user_management.hr_user_management"):obj>', auth='public')
-#     def object(self, obj, **kw):
-#         return http.request.render('hr_user_management.object', {
-#             'object': obj
-#         })
+class HrUserManagement(http.Controller):
+    @http.route(
+        "/user_management/role_groups", type="http", auth="user", methods=["GET"]
+    )
+    def role_groups(self, codes="", **kw):
+        """Preview the groups granted by the comma-separated role ``codes``.
 
+        Clients sending back the ETag in ``If-None-Match`` get a 304 while the
+        groups of these roles are unchanged. Only internal users may see
+        the groups of the roles.
+        """
+        if not request.env.user._is_internal():
+            raise Forbidden()
+        codes = tuple(sorted({code.strip() for code in codes.split(",")} - {""}))
+        etag, body = request.env["hr.user.role"]._get_groups_preview(codes)
+
+        if request.httprequest.if_none_match.contains(etag):
+            response = request.make_response("", status=304)
+        else:
+            response = request.make_response(
+                body, headers=[("Content-Type", "application/json")]
+            )
+        response.set_etag(etag)
+        # Cached by the browser only, always revalidated
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _get_password_reset(self, token):
+        reset = request.env["hr.user.password.reset"].search(
+            [("token", "=", token)], limit=1
+        )
+        if not reset:
+            raise request.not_found()
+        return reset
+
+    @http.route(
+        "/user_management/password_reset/<string:token>",
+        type="http",
+        auth="user",
+        methods=["GET"],
+    )
+    def password_reset_confirm(self, token, **kw):
+        """Ask for confirmation before resetting the passwords of a pending
+        reset, the reset itself needs a POST carrying a CSRF token."""
+        reset = self._get_password_reset(token)
+        reset._check_pending()
+        return request.render(
+            "user_management_module.password_reset_confirm",
+            {"reset": reset, "action": reset._get_export_url()},
+        )
+
+    @http.route(
+        "/user_management/password_reset/<string:token>",
+        type="http",
+        auth="user",
+        methods=["POST"],
+        csrf=True,
+    )
+    def password_reset_export(self, token, **kw):
+        """Reset the passwords of a pending reset and stream them as CSV.
+
+        The export can be downloaded once only, the rows are written out one
+        by one once the transaction is committed.
+        """
+        reset = self._get_password_reset(token)
+        rows = reset._reset_passwords()
+
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(["login", "name", "password"])
+            for row in rows:
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+
+        return request.make_response(
+            generate(),
+            headers=[
+                ("Content-Type", "text/csv; charset=utf-8"),
+                ("Content-Disposition", 'attachment; filename="passwords.csv"'),
+                ("Cache-Control", "no-store"),
+            ],
+        )
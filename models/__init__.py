@@ -1,6 +1,15 @@
 # -*- coding: utf-8 -*-
 
 from . import models
+from . import user_instrumentation
+from . import password_policy
 from . import create_user_wizard
+from . import bulk_create_user_wizard
+from . import user_import_wizard
 from . import hr_employee
 from . import hr_user_role
+from . import res_groups
+from . import ir_model_data
+from . import res_users
+from . import user_provision_queue
+from . import user_password_reset
@@ -0,0 +1,155 @@
+import logging
+import time
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+from .bulk_mode import deferred_cache_invalidation
+
+_logger = logging.getLogger(__name__)
+
+
+class HrBulkCreateUserWizard(models.TransientModel):
+    _name = "hr.bulk.create.user.wizard"
+    _description = "Create Users for Several Employees"
+    # Abandoned wizards hold password hashes, do not keep them around
+    _transient_max_hours = 0.25
+
+    employee_ids = fields.Many2many("hr.employee", string="Employees", required=True)
+    user_role_ids = fields.Many2many("hr.user.role", string="User Roles", required=True)
+    # Never stored: the password is checked and hashed as soon as it is set,
+    # only the hash and the outcome of the confirmation are kept
+    password = fields.Char(
+        string="Initial Password",
+        compute="_compute_passwords",
+        inverse="_inverse_passwords",
+    )
+    confirm_password = fields.Char(
+        string="Confirm Password",
+        compute="_compute_passwords",
+        inverse="_inverse_passwords",
+    )
+    password_hash = fields.Char(groups="base.group_system", copy=False)
+    password_status = fields.Selection(
+        [("missing", "Missing"), ("mismatch", "Mismatch"), ("ok", "OK")],
+        copy=False,
+    )
+
+    @api.model
+    def default_get(self, fields_list):
+        """Pre-fill the employees selected in the list view"""
+        res = super().default_get(fields_list)
+
+        if self._context.get("active_model") == "hr.employee":
+            res["employee_ids"] = [(6, 0, self._context.get("active_ids", []))]
+
+        return res
+
+    def _compute_passwords(self):
+        for wizard in self:
+            wizard.password = False
+            wizard.confirm_password = False
+
+    def _inverse_passwords(self):
+        """Check and hash the password, the plaintext is never stored"""
+        Users = self.env["res.users"].sudo()
+        for wizard in self:
+            password, confirm_password = wizard.password, wizard.confirm_password
+            vals = {"password_hash": False, "password_status": False}
+            if not password or not confirm_password:
+                if password or confirm_password:
+                    vals["password_status"] = "missing"
+            elif password != confirm_password:
+                vals["password_status"] = "mismatch"
+            else:
+                # Checked against the login of every selected employee
+                logins = wizard.employee_ids.mapped("work_email") or [None]
+                vals["password_hash"] = Users._hash_passwords(
+                    [password] * len(logins), logins=logins
+                )[password]
+                vals["password_status"] = "ok"
+            wizard.sudo().write(vals)
+
+    def action_create_users(self):
+        """Create one user per selected employee, in a single batch"""
+        self.ensure_one()
+
+        # The password itself was checked when it was set
+        if self.password_status == "mismatch":
+            raise UserError("Passwords do not match.")
+
+        if self.password_status != "ok":
+            raise UserError("Password and Confirm Password are required.")
+
+        if not self.user_role_ids:
+            raise UserError("At least one role must be selected.")
+
+        # Employees already linked to a user or without work email are skipped
+        employees = self.employee_ids.filtered(
+            lambda employee: not employee.user_id and employee.work_email
+        )
+        skipped = len(self.employee_ids) - len(employees)
+        if not employees:
+            raise UserError(
+                "None of the selected employees can get a new user: they "
+                "already have one or have no work email."
+            )
+
+        entries = [
+            {
+                "employee": employee,
+                "login": employee.work_email,
+                "password_hash": self.sudo().password_hash,
+                "roles": self.user_role_ids,
+            }
+            for employee in employees
+        ]
+
+        # Large selections go through the background queue
+        threshold = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("user_management_module.provision_async_threshold", 200)
+        )
+        if len(entries) > threshold:
+            batch = self.env["hr.user.provision.batch"].sudo()._enqueue(entries)
+            # Done with the wizard, drop its row and the password hash with it
+            self.unlink()
+            return {
+                "type": "ir.actions.act_window",
+                "res_model": "hr.user.provision.batch",
+                "res_id": batch.id,
+                "view_mode": "form",
+                "target": "current",
+            }
+
+        start = time.perf_counter()
+        with deferred_cache_invalidation(self.env):
+            users = self.env["hr.employee"]._provision_users(entries)
+        elapsed = time.perf_counter() - start
+        rate = len(users) / elapsed if elapsed else float(len(users))
+        _logger.info(
+            "Provisioned %d users in %.3fs (%.1f users/s)", len(users), elapsed, rate
+        )
+
+        message = f"{len(users)} users created ({rate:.1f} users/s)."
+        if skipped:
+            message += f" {skipped} employees skipped (existing user or no work email)."
+
+        # Done with the wizard, drop its row and the password hash with it
+        self.unlink()
+
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Success",
+                "message": message,
+                "type": "success",
+                "sticky": False,
+                "next": {
+                    "type": "ir.actions.client",
+                    "tag": "reload",
+                },
+            },
+        }
@@ -0,0 +1,73 @@
+import threading
+from contextlib import contextmanager
+
+# Cache names whose clearing is pending, per database then per thread
+_pending_clears = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def deferred_cache_invalidation(env):
+    """Defer the registry cache clearing of the current thread until the end
+    of the block, then clear the requested caches once.
+
+    Bulk provisioning writes ``groups_id`` many times, and each write clears
+    the access rights caches that this worker, and every other worker at the
+    next signaling, then rebuilds. Other threads are not affected.
+
+    Inside the block, the registry caches read by the current thread may be
+    stale, e.g. ``has_group`` after a change of the user's groups.
+    """
+    registry = env.registry
+    dbname = registry.db_name
+    ident = threading.get_ident()
+
+    with _lock:
+        threads = _pending_clears.setdefault(dbname, {})
+        if ident in threads:
+            # Nested, the outer block clears the caches
+            nested = True
+        else:
+            nested = False
+            if not threads:
+                _install(registry)
+            threads[ident] = set()
+    if nested:
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        with _lock:
+            cache_names = threads.pop(ident)
+            if not threads:
+                del _pending_clears[dbname]
+                _uninstall(registry)
+        if cache_names:
+            registry.clear_cache(*cache_names)
+
+
+def _install(registry):
+    """Replace ``clear_cache`` on ``registry`` by a version deferring the
+    calls made by threads in a bulk block"""
+    dbname = registry.db_name
+    clear_cache = registry.clear_cache
+
+    def deferring_clear_cache(*cache_names):
+        pending = _pending_clears.get(dbname, {}).get(threading.get_ident())
+        if pending is None:
+            return clear_cache(*cache_names)
+        pending.update(cache_names or ("default",))
+
+    # Restore what was there, which may itself be an instance attribute
+    deferring_clear_cache.previous = registry.__dict__.get("clear_cache")
+    registry.clear_cache = deferring_clear_cache
+
+
+def _uninstall(registry):
+    previous = registry.clear_cache.previous
+    if previous is None:
+        del registry.clear_cache
+    else:
+        registry.clear_cache = previous
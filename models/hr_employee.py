@@ -1,8 +1,19 @@
+import logging
+from collections import Counter, defaultdict
+
 from odoo import models, api, fields
-from odoo.exceptions import UserError
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import str2bool
+
+from .bulk_mode import deferred_cache_invalidation
+
+_logger = logging.getLogger(__name__)
+
+# User names listed in the deprovisioning notification
+NOTIFIED_USER_NAMES = 10
 
 class HrEmployee(models.Model):
-    _inherit = "hr.employee"
+    _inherit = ["hr.employee", "hr.user.instrumentation.mixin"]
 
     # Store the user roles assigned to this employee
     x_user_role_ids = fields.Many2many(
@@ -13,40 +24,152 @@ class HrEmployee(models.Model):
         string='User Roles',
         help='The roles assigned to this employee\'s user account'
     )
+    x_former_user_id = fields.Many2one(
+        'res.users',
+        string='Former User',
+        readonly=True,
+        ondelete='set null',
+        help='User archived when it was unlinked from this employee',
+    )
+
+    x_user_required = fields.Boolean(
+        string='User Required',
+        compute='_compute_x_user_required',
+        help='Whether employees must have a Related User, from the system '
+             'parameter user_management_module.require_employee_user',
+    )
+
+    def _compute_x_user_required(self):
+        self.x_user_required = self._is_user_required()
+
+    @api.model
+    def _is_user_required(self):
+        required = self.env["ir.config_parameter"].sudo().get_param(
+            "user_management_module.require_employee_user", "False"
+        )
+        return str2bool(required, False)
+
+    @api.constrains('user_id')
+    def _check_user_required(self):
+        """Server side counterpart of the required Related User of the
+        employee form, enforced when the system parameter
+        ``user_management_module.require_employee_user`` is set.
+
+        The deprovisioning actions of this module detach users on purpose
+        and skip it with the context key ``user_management_skip_user_check``.
+        """
+        if self.env.context.get("user_management_skip_user_check"):
+            return
+        if not self._is_user_required():
+            return
+        missing = self.filtered(lambda employee: not employee.user_id)
+        if missing:
+            raise ValidationError(
+                f"The Related User is required for {', '.join(missing.mapped('name'))}."
+            )
+
+    def _get_deprovision_mode(self):
+        """Return ``'delete'`` or ``'archive'``, from the context key
+        ``deprovision_mode`` or the system parameter
+        ``user_management_module.deprovision_mode``"""
+        return self.env.context.get("deprovision_mode") or self.env[
+            "ir.config_parameter"
+        ].sudo().get_param("user_management_module.deprovision_mode", "delete")
 
     def action_unlink_user(self):
-        """Unlink and delete the user from the employee"""
-        self.ensure_one()
-        
-        if not self.user_id:
+        """Unlink the users of the employees, then delete or archive them.
+
+        All employees are detached in one write and their users deleted by a
+        single ``unlink``, so the cascade over partners, followers, etc. runs
+        once for the whole set. In archive mode the users are archived and
+        stripped of their groups instead, and remembered as the former user
+        of their employee; deleting them is left to the purge cron. Users
+        with access rights the current user does not have are refused.
+        """
+        employees = self.filtered('user_id')
+        if not employees:
             raise UserError("This employee has no linked user.")
-        
-        # Store user name for confirmation message
-        user_name = self.user_id.name
-        user_to_delete = self.user_id
-        
-        # Unlink the user from employee first
-        self.write({'user_id': False})
-        
-        # Delete the user
-        user_to_delete.sudo().unlink()
-        
-        # Return action to reload the current record
+
+        users = employees.user_id
+        forbidden = users._filter_more_privileged()
+        if forbidden:
+            raise UserError(
+                "You cannot deprovision users with more access rights than "
+                f"you: {', '.join(forbidden.mapped('login'))}"
+            )
+        archive = self._get_deprovision_mode() == 'archive'
+        # Store user names for the confirmation message
+        user_names = users.mapped('name')
+
+        with self._instrument_action("unlink_user"):
+            # Unlink the users from the employees first
+            with self._instrument_phase("unlink_employee"):
+                if archive:
+                    for employee in employees:
+                        employee.x_former_user_id = employee.user_id
+                employees.with_context(
+                    user_management_skip_user_check=True
+                ).write({'user_id': False})
+
+            if archive:
+                with self._instrument_phase("archive_user"):
+                    users._archive_deprovisioned()
+            else:
+                # Delete the users
+                with self._instrument_phase("delete_user"):
+                    users.sudo().unlink()
+
+        done = 'archived' if archive else 'deleted'
+        if len(user_names) == 1:
+            title = f'User {done.capitalize()}'
+            message = f'User "{user_names[0]}" has been {done}.'
+        else:
+            title = f'Users {done.capitalize()}'
+            listed = ", ".join(user_names[:NOTIFIED_USER_NAMES])
+            if len(user_names) > NOTIFIED_USER_NAMES:
+                listed += f' and {len(user_names) - NOTIFIED_USER_NAMES} more'
+            message = f'{len(user_names)} users have been {done}: {listed}.'
+        skipped = len(self - employees)
+        if skipped:
+            message += f' {skipped} employees had no linked user.'
+
         return {
-            'type': 'ir.actions.act_window',
-            'res_model': 'hr.employee',
-            'res_id': self.id,
-            'view_mode': 'form',
-            'view_type': 'form',
-            'target': 'current',
-            'context': {
-                'display_notification': {
-                    'type': 'success',
-                    'title': 'User Deleted',
-                    'message': f'User "{user_name}" has been deleted.',
-                    'sticky': False,
-                }
-            }
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'type': 'success',
+                'title': title,
+                'message': message,
+                'sticky': False,
+                'next': {
+                    'type': 'ir.actions.client',
+                    'tag': 'reload',
+                },
+            },
+        }
+
+    def action_reset_passwords(self):
+        """Reset the passwords of the employees' users to generated ones.
+
+        The reset happens when the returned one-time export is downloaded, so
+        the new passwords are never stored in clear. Users with access rights
+        the current user does not have are refused.
+        """
+        if not self.user_id:
+            raise UserError("None of these employees has a linked user.")
+        forbidden = self.user_id._filter_more_privileged()
+        if forbidden:
+            raise UserError(
+                "You cannot reset the password of users with more access "
+                f"rights than you: {', '.join(forbidden.mapped('login'))}"
+            )
+        reset = self.env["hr.user.password.reset"].create(
+            {"user_ids": [(6, 0, self.user_id.ids)]}
+        )
+        return {
+            "type": "ir.actions.act_url",
+            "url": reset._get_export_url(),
+            "target": "self",
         }
 
     def action_open_create_user_wizard(self):
@@ -63,3 +186,195 @@ class HrEmployee(models.Model):
                 "default_login": self.work_email,
             },
         }
+
+    @api.model
+    def _provision_users(self, entries):
+        """Create the users of many employees in one pass.
+
+        Logins are checked for conflicts in one query and all users are
+        created by a single ``create`` that already carries their final
+        groups, so no ``groups_id`` write follows. Passwords are hashed in
+        parallel beforehand and stored by one UPDATE. Each employee then gets
+        one write linking its user, which also stores its roles unless other
+        employees of the batch share them: shared role sets are stored with
+        one write per role set.
+
+        :param entries: list of dicts with keys ``employee`` (hr.employee),
+            ``login``, ``roles`` (hr.user.role) and either ``password`` or
+            ``password_hash`` (already hashed with the users crypt context)
+        :return: the created users, in the order of ``entries``
+        """
+        normalize_login = self.env["res.users"]._normalize_login
+        with self._instrument_phase("check_logins"):
+            logins = [normalize_login(entry["login"]) for entry in entries]
+            conflicts = {
+                login for login, count in Counter(logins).items() if count > 1
+            }
+            conflicts |= self.env["res.users"]._get_existing_logins(logins)
+        if len(conflicts) == 1:
+            raise UserError(f"A user with login '{conflicts.pop()}' already exists.")
+        if conflicts:
+            raise UserError(
+                f"These logins are already used: {', '.join(sorted(conflicts))}"
+            )
+
+        Role = self.env["hr.user.role"]
+        vals_list = []
+        with self._instrument_phase("resolve_groups"):
+            for entry in entries:
+                group_ids = set()
+                for code in entry["roles"].mapped("code"):
+                    group_ids |= Role._get_group_ids_by_code(code)
+                vals = {
+                    "name": entry["employee"].name,
+                    "login": entry["login"].strip(),
+                    "email": entry["login"].strip(),
+                    "groups_id": [(6, 0, list(group_ids))],
+                }
+                vals_list.append(vals)
+
+        Users = self.env["res.users"].sudo()
+        with self._instrument_phase("hash_passwords"):
+            hashes = Users._hash_passwords(
+                [entry.get("password") for entry in entries], logins=logins
+            )
+
+        with self._instrument_phase("create_users"):
+            users = Users.create(vals_list)
+            Users._set_encrypted_passwords(
+                {
+                    user.id: entry.get("password_hash") or hashes[entry["password"]]
+                    for user, entry in zip(users, entries)
+                    if entry.get("password_hash") or entry.get("password")
+                }
+            )
+
+        with self._instrument_phase("link_employees"):
+            role_counts = Counter(entry["roles"] for entry in entries)
+            employees_by_roles = defaultdict(lambda: self.env["hr.employee"])
+            for user, entry in zip(users, entries):
+                vals = {"user_id": user.id}
+                if role_counts[entry["roles"]] > 1:
+                    employees_by_roles[entry["roles"]] |= entry["employee"]
+                else:
+                    vals["x_user_role_ids"] = [(6, 0, entry["roles"].ids)]
+                entry["employee"].sudo().write(vals)
+            for roles, employees in employees_by_roles.items():
+                employees.sudo().write({"x_user_role_ids": [(6, 0, roles.ids)]})
+
+        return users
+
+    @api.model
+    def _get_role_drift(self):
+        """Compare the groups of the users of employees with roles to the
+        groups of these roles, in a single query.
+
+        A user drifts when it misses a group of its roles, or has a group
+        of some role that neither its roles nor the groups they imply grant.
+        Groups no role grants are left alone, they were given by hand or by
+        other modules. Only active users of active employees with at least
+        one role are checked.
+
+        :return: tuple ``(checked, drift)``, the number of users checked and
+            a dict mapping ``(added_group_ids, removed_group_ids)`` tuples to
+            the ids of the users needing exactly that change
+        """
+        self.env["hr.user.role"].flush_model(["group_ids"])
+        self.flush_model(["user_id", "active", "x_user_role_ids"])
+        self.env["res.users"].flush_model(["active", "groups_id"])
+        self.env["res.groups"].flush_model(["implied_ids"])
+
+        self.env.cr.execute("""
+            WITH RECURSIVE expected AS (
+                SELECT DISTINCT e.user_id AS uid, rg.group_id AS gid
+                  FROM hr_employee e
+                  JOIN res_users u ON u.id = e.user_id AND u.active
+                  JOIN hr_employee_user_role_rel er ON er.employee_id = e.id
+                  JOIN hr_user_role_group_rel rg ON rg.role_id = er.role_id
+                 WHERE e.active
+            ), allowed AS (
+                SELECT uid, gid FROM expected
+                 UNION
+                SELECT a.uid, i.hid
+                  FROM allowed a
+                  JOIN res_groups_implied_rel i ON i.gid = a.gid
+            ), users AS (
+                SELECT DISTINCT uid FROM expected
+            ), missing AS (
+                SELECT uid, gid FROM expected
+                EXCEPT
+                SELECT uid, gid FROM res_groups_users_rel
+            ), extra AS (
+                SELECT r.uid, r.gid
+                  FROM res_groups_users_rel r
+                  JOIN users ON users.uid = r.uid
+                 WHERE r.gid IN (SELECT group_id FROM hr_user_role_group_rel)
+                EXCEPT
+                SELECT uid, gid FROM allowed
+            )
+            SELECT users.uid, m.gids, x.gids
+              FROM users
+              LEFT JOIN (
+                    SELECT uid, array_agg(gid ORDER BY gid) AS gids
+                      FROM missing
+                     GROUP BY uid
+                   ) m ON m.uid = users.uid
+              LEFT JOIN (
+                    SELECT uid, array_agg(gid ORDER BY gid) AS gids
+                      FROM extra
+                     GROUP BY uid
+                   ) x ON x.uid = users.uid
+        """)
+        rows = self.env.cr.fetchall()
+
+        drift = defaultdict(list)
+        for uid, added, removed in rows:
+            if added or removed:
+                drift[tuple(added or ()), tuple(removed or ())].append(uid)
+        return len(rows), dict(drift)
+
+    @api.model
+    def _cron_reconcile_role_groups(self):
+        """Give the users of employees exactly the groups of their roles.
+
+        Users needing the same change are fixed together by one write, in its
+        own savepoint: a write that fails is logged and counted, and does not
+        prevent the other changes.
+
+        :return: dict of counts describing the run
+        """
+        checked, drift = self._get_role_drift()
+        Users = self.env["res.users"].sudo()
+        report = {
+            "checked": checked,
+            "drifted": 0,
+            "added": 0,
+            "removed": 0,
+            "failed": 0,
+        }
+        with deferred_cache_invalidation(self.env):
+            for (added, removed), user_ids in drift.items():
+                try:
+                    with self.env.cr.savepoint():
+                        Users.browse(user_ids).write(
+                            {
+                                "groups_id": [(4, group_id) for group_id in added]
+                                + [(3, group_id) for group_id in removed]
+                            }
+                        )
+                except Exception as e:
+                    _logger.warning(
+                        "Role drift: cannot fix the groups of users %s: %s", user_ids, e
+                    )
+                    report["failed"] += len(user_ids)
+                    continue
+                report["drifted"] += len(user_ids)
+                report["added"] += len(added) * len(user_ids)
+                report["removed"] += len(removed) * len(user_ids)
+
+        _logger.info(
+            "Role drift: %(checked)d users checked, %(drifted)d fixed, "
+            "%(failed)d failed, %(added)d group links added, %(removed)d removed",
+            report,
+        )
+        return report
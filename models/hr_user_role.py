@@ -1,8 +1,403 @@
-from odoo import models, fields
+import hashlib
+import json
+from collections import Counter, defaultdict
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import ValidationError
+from odoo.osv import expression
+from odoo.tools import split_every
+
+from .bulk_mode import deferred_cache_invalidation
+
+# Hit/miss counters of the role group cache, per database
+ROLE_GROUP_CACHE_STATS = defaultdict(Counter)
+
+# Users updated per write when reapplying a role
+REAPPLY_BATCH_SIZE = 500
+
 
 class HrUserRole(models.Model):
     _name = "hr.user.role"
     _description = "HR User Role"
 
     name = fields.Char(required=True)
-    code = fields.Char(required=True)
+    code = fields.Char(required=True, index=True)
+    rule_ids = fields.One2many("hr.user.role.rule", "role_id", string="Group Rules")
+    group_ids = fields.Many2many(
+        "res.groups",
+        "hr_user_role_group_rel",
+        "role_id",
+        "group_id",
+        string="Groups",
+        compute="_compute_group_ids",
+        store=True,
+        help="Groups granted by this role, precomputed from its rules",
+    )
+    applied_group_ids = fields.Many2many(
+        "res.groups",
+        "hr_user_role_applied_group_rel",
+        "role_id",
+        "group_id",
+        string="Groups Applied to Users",
+        readonly=True,
+        copy=False,
+        help="Groups of this role when it was created or last reapplied to "
+        "its users",
+    )
+
+    @api.depends(
+        "rule_ids.xmlid",
+        "rule_ids.category",
+        "rule_ids.group_names",
+        "rule_ids.excluded_group_names",
+    )
+    def _compute_group_ids(self):
+        group_ids_by_role = self._resolve_rule_group_ids()
+        for role in self:
+            role.group_ids = [(6, 0, list(group_ids_by_role[role.id]))]
+        self.env.registry.clear_cache()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        roles = super().create(vals_list)
+        roles._snapshot_applied_group_ids()
+        self.env.registry.clear_cache()
+        return roles
+
+    def write(self, vals):
+        res = super().write(vals)
+        if "code" in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    def _register_hook(self):
+        super()._register_hook()
+        # Groups and XML IDs of freshly installed/upgraded modules
+        if self.pool.updated_modules:
+            # Roles created before applied groups were tracked hand out their
+            # groups as stored until now
+            self.sudo().search([])._snapshot_applied_group_ids()
+            self._refresh_group_ids()
+
+    def _snapshot_applied_group_ids(self):
+        """Record the current groups of the roles that have no applied groups
+        yet as applied: these are the groups their holders were given"""
+        for role in self.filtered(lambda role: not role.applied_group_ids):
+            role.applied_group_ids = [(6, 0, role.group_ids.ids)]
+
+    @api.model
+    def _resolve_group_xmlids(self, xmlids):
+        """Map ``res.groups`` XML IDs to their record ids in a single query.
+
+        XML IDs of modules that are not installed are silently left out.
+        """
+        keys = {tuple(xmlid.split(".", 1)) for xmlid in xmlids if "." in xmlid}
+        if not keys:
+            return {}
+
+        data = (
+            self.env["ir.model.data"]
+            .sudo()
+            .search_read(
+                [
+                    ("model", "=", "res.groups"),
+                    ("module", "in", list({module for module, __ in keys})),
+                    ("name", "in", list({name for __, name in keys})),
+                ],
+                ["module", "name", "res_id"],
+            )
+        )
+        return {
+            f"{row['module']}.{row['name']}": row["res_id"]
+            for row in data
+            if (row["module"], row["name"]) in keys
+        }
+
+    def _resolve_rule_group_ids(self):
+        """Resolve the rules of the roles in ``self`` to group ids.
+
+        All XML IDs are looked up in one query, then each role costs one
+        ``res.groups`` search combining its criteria with its XML ID groups,
+        which also filters out ids whose group no longer exists.
+
+        :return: dict mapping each role id to a set of group ids
+        """
+        # Base user group (required for all users)
+        base_xmlids = ["base.group_user"]
+        xmlid_group_ids = self._resolve_group_xmlids(
+            base_xmlids + [xmlid for xmlid in self.rule_ids.mapped("xmlid") if xmlid]
+        )
+
+        # Criteria are written against the English names, match them as such
+        # whatever the language of the current user
+        Groups = self.env["res.groups"].sudo().with_context(lang="en_US")
+        group_ids_by_role = {}
+        for role in self:
+            xmlids = base_xmlids + role.rule_ids.mapped("xmlid")
+            ids = [xmlid_group_ids[x] for x in xmlids if x in xmlid_group_ids]
+            domain = expression.OR(
+                [role.rule_ids._get_groups_domain(), [("id", "in", ids)]]
+            )
+            group_ids_by_role[role.id] = set(Groups.search(domain).ids)
+        return group_ids_by_role
+
+    @api.model
+    def _invalidate_group_ids(self):
+        """Mark the groups of all roles to be recomputed at the next flush"""
+        roles = self.sudo().search([])
+        self.env.add_to_compute(self._fields["group_ids"], roles)
+        self.env.registry.clear_cache()
+
+    @api.model
+    def _refresh_group_ids(self):
+        """Recompute the groups of all roles in bulk"""
+        self._invalidate_group_ids()
+        self.sudo().search([]).flush_recordset(["group_ids"])
+
+    def action_refresh_group_ids(self):
+        self._refresh_group_ids()
+
+    def action_reapply_groups(self):
+        counts = Counter()
+        with deferred_cache_invalidation(self.env):
+            for role in self:
+                counts.update(role._reapply_groups())
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "title": "Roles Reapplied",
+                "message": f"{counts['users']} users updated, "
+                f"{counts['added']} groups added and {counts['removed']} removed.",
+                "type": "success",
+                "sticky": False,
+            },
+        }
+
+    def _get_holder_user_ids(self):
+        """Return the ids of the active users of the employees holding the
+        role, in one query"""
+        self.ensure_one()
+        self.env["hr.employee"].flush_model(["user_id", "active", "x_user_role_ids"])
+        self.env["res.users"].flush_model(["active"])
+        self.env.cr.execute(
+            """
+            SELECT DISTINCT e.user_id
+              FROM hr_employee e
+              JOIN hr_employee_user_role_rel er ON er.employee_id = e.id
+              JOIN res_users u ON u.id = e.user_id AND u.active
+             WHERE er.role_id = %s AND e.active
+            """,
+            [self.id],
+        )
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    def _get_group_ids_from_other_roles(self, user_ids, group_ids):
+        """Return, for the users ``user_ids``, which of ``group_ids`` their
+        employees' other roles grant, in one query.
+
+        :return: dict mapping user ids to sets of group ids
+        """
+        self.ensure_one()
+        self.env.cr.execute(
+            """
+            SELECT e.user_id, array_agg(DISTINCT rg.group_id)
+              FROM hr_employee e
+              JOIN hr_employee_user_role_rel er ON er.employee_id = e.id
+              JOIN hr_user_role_group_rel rg ON rg.role_id = er.role_id
+             WHERE e.user_id = ANY(%s)
+               AND e.active
+               AND er.role_id != %s
+               AND rg.group_id = ANY(%s)
+             GROUP BY e.user_id
+            """,
+            [user_ids, self.id, group_ids],
+        )
+        return {user_id: set(ids) for user_id, ids in self.env.cr.fetchall()}
+
+    def _reapply_groups(self):
+        """Bring the groups of the users holding the role in line with its
+        current groups.
+
+        The change since the role was created or last reapplied is computed
+        once for the role. Its holders all get the same added groups, and lose
+        the removed groups that none of their other roles grant; users needing
+        the same change are updated together, ``REAPPLY_BATCH_SIZE`` at a
+        time, with one flush and cache invalidation per batch.
+
+        :return: dict with the number of ``users`` updated and of groups
+            ``added`` to and ``removed`` from the role
+        """
+        self.ensure_one()
+        self.flush_recordset(["group_ids"])
+        added = self.group_ids - self.applied_group_ids
+        removed = self.applied_group_ids - self.group_ids
+
+        user_ids = self._get_holder_user_ids() if added or removed else []
+        kept = {}
+        if user_ids and removed:
+            kept = self._get_group_ids_from_other_roles(user_ids, removed.ids)
+
+        user_ids_by_removal = defaultdict(list)
+        for user_id in user_ids:
+            removal = set(removed.ids) - kept.get(user_id, set())
+            user_ids_by_removal[tuple(sorted(removal))].append(user_id)
+
+        Users = self.env["res.users"].sudo()
+        for removal, removal_user_ids in user_ids_by_removal.items():
+            commands = [(4, group_id) for group_id in added.ids] + [
+                (3, group_id) for group_id in removal
+            ]
+            if not commands:
+                continue
+            for batch in split_every(REAPPLY_BATCH_SIZE, removal_user_ids):
+                Users.browse(batch).write({"groups_id": commands})
+                self.env.flush_all()
+                self.env.invalidate_all()
+
+        self.applied_group_ids = [(6, 0, self.group_ids.ids)]
+        return {"users": len(user_ids), "added": len(added), "removed": len(removed)}
+
+    @api.model
+    @tools.ormcache("code")
+    def _get_cached_group_ids_by_code(self, code):
+        ROLE_GROUP_CACHE_STATS[self.env.cr.dbname]["miss"] += 1
+        return frozenset(self.sudo().search([("code", "=", code)]).group_ids.ids)
+
+    @api.model
+    def _get_group_ids_by_code(self, code):
+        """Return the frozenset of group IDs granted by the role ``code``.
+
+        The result is kept in the registry cache, so it is shared by the whole
+        process for a given database and dropped together with the registry
+        caches: on module install/upgrade (registry reload), when the groups
+        of a role are recomputed and when a role is created, deleted or has
+        its code changed.
+        """
+        stats = ROLE_GROUP_CACHE_STATS[self.env.cr.dbname]
+        misses = stats["miss"]
+        group_ids = self._get_cached_group_ids_by_code(code)
+        if stats["miss"] == misses:
+            stats["hit"] += 1
+        return group_ids
+
+    @api.model
+    @tools.ormcache("codes", "self.env.lang")
+    def _get_groups_preview(self, codes):
+        """Return ``(etag, body)`` previewing the groups granted by the role
+        ``codes`` (a sorted tuple) as JSON.
+
+        The ETag is a hash of the body, so it only changes with the resolved
+        groups and is the same on every worker. The preview is kept in the
+        registry cache, which role and group changes clear.
+        """
+        group_ids_by_code = {
+            code: sorted(self._get_group_ids_by_code(code)) for code in codes
+        }
+        group_ids = sorted(set().union(*group_ids_by_code.values()))
+        groups = self.env["res.groups"].sudo().browse(group_ids)
+        body = json.dumps(
+            {
+                "roles": group_ids_by_code,
+                "groups": [
+                    {
+                        "id": group.id,
+                        "name": group.name,
+                        "category": group.category_id.name or "",
+                    }
+                    for group in groups
+                ],
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(body.encode()).hexdigest()[:32], body
+
+    @api.model
+    def _get_group_cache_stats(self):
+        """Return the hit/miss counters of the role group cache"""
+        stats = ROLE_GROUP_CACHE_STATS[self.env.cr.dbname]
+        return {"hit": stats["hit"], "miss": stats["miss"]}
+
+
+class HrUserRoleRule(models.Model):
+    _name = "hr.user.role.rule"
+    _description = "HR User Role Group Rule"
+    _order = "role_id, sequence, id"
+
+    role_id = fields.Many2one(
+        "hr.user.role", required=True, ondelete="cascade", index=True
+    )
+    sequence = fields.Integer(default=10)
+    name = fields.Char(string="Description")
+    xmlid = fields.Char(
+        string="Group XML ID",
+        help="Grant this group, e.g. 'hr.group_hr_user'. Ignored when the "
+        "module is not installed.",
+    )
+    category = fields.Char(
+        help="Grant the groups of this application category (English name)"
+    )
+    group_names = fields.Char(
+        help="Comma-separated English names of the groups to grant, within "
+        "the category if one is set",
+    )
+    excluded_group_names = fields.Char(
+        help="Comma-separated English names of the groups never granted by "
+        "this rule",
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        rules = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return rules
+
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.constrains("xmlid", "category", "group_names")
+    def _check_rule_target(self):
+        for rule in self:
+            if rule.xmlid and "." not in rule.xmlid:
+                raise ValidationError(
+                    f"'{rule.xmlid}' is not a valid XML ID (module.name)."
+                )
+            if not (rule.xmlid or rule.category or rule.group_names):
+                raise ValidationError(
+                    "A role rule needs an XML ID, a category or group names."
+                )
+
+    @staticmethod
+    def _split_names(names):
+        return [name.strip() for name in (names or "").split(",") if name.strip()]
+
+    def _get_groups_domain(self):
+        """Combine the category/name criteria of the rules into one domain"""
+        domains = []
+        for rule in self:
+            if rule.xmlid:
+                continue
+            domain = []
+            if rule.category:
+                domain.append(("category_id.name", "=", rule.category))
+            if rule.group_names:
+                domain.append(("name", "in", self._split_names(rule.group_names)))
+            if rule.excluded_group_names:
+                domain.append(
+                    ("name", "not in", self._split_names(rule.excluded_group_names))
+                )
+            domains.append(domain)
+
+        return expression.OR(domains) if domains else expression.FALSE_DOMAIN
@@ -0,0 +1,31 @@
+from odoo import models, api
+
+
+class IrModelData(models.Model):
+    _inherit = "ir.model.data"
+
+    # The groups of hr.user.role are precomputed from group XML IDs,
+    # recompute them whenever those change.
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        if any(vals.get("model") == "res.groups" for vals in vals_list):
+            self.env["hr.user.role"]._invalidate_group_ids()
+        return records
+
+    def write(self, vals):
+        touches_groups = vals.get("model") == "res.groups" or any(
+            data.model == "res.groups" for data in self
+        )
+        res = super().write(vals)
+        if touches_groups:
+            self.env["hr.user.role"]._invalidate_group_ids()
+        return res
+
+    def unlink(self):
+        touches_groups = any(data.model == "res.groups" for data in self)
+        res = super().unlink()
+        if touches_groups:
+            self.env["hr.user.role"]._invalidate_group_ids()
+        return res
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import math
+import mmap
+import os
+import struct
+
+from odoo import models, api
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+BLOOM_MAGIC = b"UMBLOOM1"
+# magic, size in bits, number of hash functions
+BLOOM_HEADER = struct.Struct("<8sQI")
+
+# Logins whose name part is shorter are not looked for in passwords
+MIN_LOGIN_NAME_LENGTH = 4
+
+# Opened filters of this process, by path, with the mtime they were read at
+_bloom_filters = {}
+
+
+class BloomFilter:
+    """Read-only Bloom filter over a memory-mapped file, see :meth:`build`.
+
+    The file is mapped rather than read, so workers share the pages of the
+    OS cache instead of holding their own copy, and a lookup only touches
+    ``hash_count`` bytes.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.size, self.hash_count = BLOOM_HEADER.unpack_from(self._mmap)
+        if magic != BLOOM_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a password filter file")
+
+    def close(self):
+        self._mmap.close()
+
+    @staticmethod
+    def _indexes(value, size, hash_count):
+        # Double hashing, the bit positions derive from one digest
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % size for i in range(hash_count))
+
+    def __contains__(self, value):
+        data, offset = self._mmap, BLOOM_HEADER.size
+        return all(
+            data[offset + (index >> 3)] & (1 << (index & 7))
+            for index in self._indexes(value, self.size, self.hash_count)
+        )
+
+    @classmethod
+    def build(cls, values, count, path, error_rate=0.001):
+        """Write a filter of the ``count`` strings ``values`` to ``path``,
+        sized for a false positive rate of ``error_rate``"""
+        count = max(count, 1)
+        size = max(8, math.ceil(-count * math.log(error_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(size / count * math.log(2)))
+
+        bits = bytearray((size + 7) // 8)
+        for value in values:
+            for index in cls._indexes(value, size, hash_count):
+                bits[index >> 3] |= 1 << (index & 7)
+
+        # Workers may map the current file, replace it atomically
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(BLOOM_HEADER.pack(BLOOM_MAGIC, size, hash_count))
+            file.write(bits)
+        os.replace(temp_path, path)
+        return size, hash_count
+
+
+class HrUserPasswordPolicy(models.AbstractModel):
+    _name = "hr.user.password.policy"
+    _description = "User Password Policy"
+
+    @api.model
+    def _get_breached_filter(self):
+        """Return the breached passwords filter set by the system parameter
+        ``user_management_module.breached_password_filter``, if any"""
+        path = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("user_management_module.breached_password_filter")
+        )
+        if not path:
+            return None
+        # A replaced filter is dropped, not closed: other threads may still
+        # be looking up passwords in it, its mapping goes away with them
+        cached = _bloom_filters.get(path)
+        try:
+            mtime = os.stat(path).st_mtime
+            if not cached or cached[0] != mtime:
+                cached = _bloom_filters[path] = (mtime, BloomFilter(path))
+        except (OSError, ValueError) as e:
+            _logger.warning("Cannot read the breached password filter: %s", e)
+            _bloom_filters.pop(path, None)
+            return None
+        return cached[1]
+
+    @api.model
+    def _get_password_problems(self, password, login=None):
+        """Return the reasons why ``password`` is refused, if any"""
+        min_length = int(
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("user_management_module.password_min_length", 8)
+        )
+        problems = []
+        if len(password) < min_length:
+            problems.append(f"It must have at least {min_length} characters.")
+        # Short names, e.g. "it" or "al", are found in too many passwords
+        name = (login or "").split("@")[0].lower()
+        if len(name) >= MIN_LOGIN_NAME_LENGTH and name in password.lower():
+            problems.append("It must not contain the login.")
+        breached = self._get_breached_filter()
+        if breached is not None and password in breached:
+            problems.append("It appears in a list of breached passwords.")
+        return problems
+
+    @api.model
+    def _check_password(self, password, login=None):
+        """Raise if ``password`` does not follow the password policy"""
+        problems = self._get_password_problems(password, login)
+        if problems:
+            raise UserError(" ".join(["This password cannot be used."] + problems))
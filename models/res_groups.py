@@ -0,0 +1,25 @@
+from odoo import models, api
+
+
+class ResGroups(models.Model):
+    _inherit = "res.groups"
+
+    # The groups of hr.user.role are precomputed from group names and
+    # categories, recompute them whenever those change.
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        groups = super().create(vals_list)
+        self.env["hr.user.role"]._invalidate_group_ids()
+        return groups
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"name", "category_id"} & set(vals):
+            self.env["hr.user.role"]._invalidate_group_ids()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env["hr.user.role"]._invalidate_group_ids()
+        return res
@@ -0,0 +1,237 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from odoo import models, fields, api, tools
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+# Threads hashing passwords in parallel
+HASH_WORKERS = os.cpu_count() or 1
+
+
+class ResUsers(models.Model):
+    _inherit = "res.users"
+
+    x_deprovision_date = fields.Datetime(
+        string="Deprovisioned On",
+        readonly=True,
+        copy=False,
+        help="Archived by employee offboarding, purged later when enabled",
+    )
+
+    def init(self):
+        super().init()
+        # Case-insensitive login lookups, see _get_existing_logins
+        tools.create_index(
+            self.env.cr, "res_users_login_lower_index", self._table, ["lower(login)"]
+        )
+
+    @staticmethod
+    def _normalize_login(login):
+        """Return ``login`` trimmed and lowercase, the form logins are compared in.
+
+        Logins are stored trimmed but keep their case, as Odoo matches the
+        login typed at sign-in case-sensitively.
+        """
+        return (login or "").strip().lower()
+
+    @api.model
+    def _get_existing_logins(self, logins, exclude_ids=()):
+        """Return which of ``logins`` are already taken, ignoring case, in a
+        single query using the ``lower(login)`` index.
+
+        Archived users are included, as they still hold their login.
+
+        :param exclude_ids: ids of users whose login does not count
+        :return: set of the taken logins, normalized
+        """
+        normalized = {self._normalize_login(login) for login in logins} - {""}
+        if not normalized:
+            return set()
+
+        self.flush_model(["login"])
+        self.env.cr.execute(
+            """
+            SELECT lower(login)
+              FROM res_users
+             WHERE lower(login) = ANY(%s)
+               AND id != ALL(%s)
+            """,
+            [list(normalized), list(exclude_ids)],
+        )
+        return {login for login, in self.env.cr.fetchall()}
+
+    def _filter_more_privileged(self):
+        """Return the users of ``self`` holding a group the current user does
+        not have, whose password or account the current user may therefore
+        not manage. Administrators may manage any user."""
+        if self.env.user._is_system():
+            return self.browse()
+        own_groups = self.env.user.groups_id
+        return self.sudo().filtered(lambda user: user.groups_id - own_groups)
+
+    @api.model
+    def _hash_passwords(self, passwords, check_policy=True, logins=None):
+        """Hash ``passwords`` with the users crypt context, in parallel.
+
+        PBKDF2 runs in ``hashlib``, which releases the GIL, so a thread pool
+        uses all the cores without forking the worker. Each distinct password
+        is hashed once.
+
+        :param check_policy: whether the passwords must pass the password
+            policy, only generated or already checked passwords should skip it
+        :param logins: the login each password is for, in the same order, see
+            :meth:`_get_rejected_passwords`
+        :return: dict mapping each password to its hash
+        :raise UserError: listing the problems of all refused passwords
+        """
+        passwords = list(passwords)
+        if check_policy:
+            rejected = self._get_rejected_passwords(passwords, logins)
+            if rejected:
+                header = (
+                    "This password cannot be used."
+                    if len(rejected) == 1
+                    else f"{len(rejected)} of these passwords cannot be used."
+                )
+                reasons = sorted({reason for r in rejected.values() for reason in r})
+                raise UserError(" ".join([header] + reasons))
+
+        passwords = list(set(passwords) - {None, False, ""})
+        if not passwords:
+            return {}
+        crypt_context = self._crypt_context()
+        workers = min(len(passwords), HASH_WORKERS)
+        if workers == 1:
+            return {password: crypt_context.hash(password) for password in passwords}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(passwords, executor.map(crypt_context.hash, passwords)))
+
+    @api.model
+    def _get_rejected_passwords(self, passwords, logins=None):
+        """Check each of ``passwords`` against the password policy.
+
+        :param logins: the login each password is for, in the same order, so
+            that passwords containing their login are refused too
+        :return: dict mapping each refused ``(password, login)`` pair, with
+            ``login`` None when no logins are given, to the list of reasons
+        """
+        passwords = list(passwords)
+        if logins is None:
+            logins = [None] * len(passwords)
+        Policy = self.env["hr.user.password.policy"]
+        rejected = {}
+        for password, login in set(zip(passwords, logins)):
+            if not password:
+                continue
+            problems = Policy._get_password_problems(password, login)
+            # Set by auth_password_policy, when installed
+            if hasattr(self, "_check_password_policy"):
+                try:
+                    self._check_password_policy([password])
+                except UserError as e:
+                    problems.append(e.args[0])
+            if problems:
+                rejected[password, login] = problems
+        return rejected
+
+    @api.model
+    def _set_encrypted_passwords(self, hashes):
+        """Store precomputed password hashes in a single UPDATE.
+
+        :param hashes: dict mapping user ids to hashes made with the users
+            crypt context, see :meth:`_hash_passwords`
+        """
+        if not hashes:
+            return
+        crypt_context = self._crypt_context()
+        if any(crypt_context.identify(pw) == "plaintext" for pw in hashes.values()):
+            raise ValueError("Only password hashes can be stored, not plaintext")
+
+        self.env.cr.execute(
+            """
+            UPDATE res_users
+               SET password = v.password
+              FROM unnest(%s::int[], %s::varchar[]) AS v(id, password)
+             WHERE res_users.id = v.id
+            """,
+            [list(hashes), list(hashes.values())],
+        )
+        self.browse(hashes).invalidate_recordset(["password"])
+
+    def _get_groups_diff_commands(self, group_ids):
+        """Return the ``groups_id`` commands giving the user the groups
+        ``group_ids``, like ``(6, 0, group_ids)`` would, but only linking and
+        unlinking the groups that differ.
+
+        Groups implied by ``group_ids`` are kept, as a replace would add them
+        back anyway. An empty list means the groups are already right.
+        """
+        self.ensure_one()
+        wanted = self.env["res.groups"].browse(group_ids)
+        expected = wanted | wanted.trans_implied_ids
+        current = self.groups_id
+        return [(4, group.id) for group in wanted - current] + [
+            (3, group.id) for group in current - expected
+        ]
+
+    def _archive_deprovisioned(self):
+        """Archive the users and remove their groups in a single write.
+
+        The base user group is kept so that the users stay valid internal
+        users should they be restored.
+        """
+        removed = self.groups_id - self.env.ref("base.group_user")
+        self.sudo().write(
+            {
+                "active": False,
+                "x_deprovision_date": fields.Datetime.now(),
+                "groups_id": [(3, group.id) for group in removed],
+            }
+        )
+
+    @api.model
+    def _cron_purge_deprovisioned(self):
+        """Delete the users archived by offboarding, in small chunks.
+
+        Disabled unless the system parameter
+        ``user_management_module.purge_deprovisioned_after_days`` is set. Users
+        that cannot be deleted, e.g. because of accounting entries, stay
+        archived and are not retried.
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        days = ICP.get_param("user_management_module.purge_deprovisioned_after_days")
+        if not days:
+            return
+        chunk_size = int(
+            ICP.get_param("user_management_module.purge_chunk_size", 20)
+        )
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        before = fields.Datetime.now() - timedelta(days=int(days))
+        domain = [
+            ("active", "=", False),
+            ("x_deprovision_date", "!=", False),
+            ("x_deprovision_date", "<", before),
+        ]
+
+        Users = self.sudo().with_context(active_test=False)
+        while users := Users.search(domain, limit=chunk_size):
+            try:
+                with self.env.cr.savepoint():
+                    users.unlink()
+            except Exception:
+                for user in users:
+                    try:
+                        with self.env.cr.savepoint():
+                            user.unlink()
+                    except Exception as e:
+                        _logger.info(
+                            "Cannot purge user %s, kept archived: %s", user.login, e
+                        )
+                        user.x_deprovision_date = False
+            if auto_commit:
+                self.env.cr.commit()
@@ -0,0 +1,245 @@
+import csv
+import io
+import itertools
+import re
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Problems reported on the batch, the rest is only counted
+MAX_REPORTED_PROBLEMS = 20
+
+
+def _iter_csv_rows(fileobj):
+    """Yield the rows of a CSV file as dicts keyed by lowercase header"""
+    reader = csv.reader(io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline=""))
+    header = [column.strip().lower() for column in next(reader, [])]
+    for row in reader:
+        yield dict(zip(header, row))
+
+
+def _iter_xlsx_rows(fileobj):
+    """Yield the rows of the first sheet of an XLSX file as dicts keyed by
+    lowercase header, without loading the whole sheet"""
+    if openpyxl is None:
+        raise UserError("The openpyxl library is required to import XLSX files.")
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(column or "").strip().lower() for column in next(rows, ())]
+        for row in rows:
+            yield {
+                column: "" if value is None else str(value)
+                for column, value in zip(header, row)
+            }
+    finally:
+        workbook.close()
+
+
+def _chunks(iterable, size):
+    """Yield lists of at most ``size`` items of ``iterable``"""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class HrUserImportWizard(models.TransientModel):
+    _name = "hr.user.import.wizard"
+    _description = "Import Users for Employees"
+    # Abandoned wizards hold a password hash, do not keep them around
+    _transient_max_hours = 0.25
+
+    file = fields.Binary(required=True, attachment=True)
+    filename = fields.Char()
+    match_key = fields.Selection(
+        [
+            ("work_email", "Work Email"),
+            ("barcode", "Badge ID"),
+            ("identification_id", "Identification No"),
+        ],
+        string="Match Employees By",
+        default="work_email",
+        required=True,
+        help="Column of the file, named after this field, used to find the "
+        "employee of each row",
+    )
+    # Never stored: the default password is checked and hashed as soon as
+    # it is set, only the hash is kept
+    password = fields.Char(
+        string="Default Password",
+        compute="_compute_password",
+        inverse="_inverse_password",
+        help="Used for rows without a 'password' column value",
+    )
+    password_hash = fields.Char(groups="base.group_system", copy=False)
+    chunk_size = fields.Integer(default=1000, required=True)
+
+    def _compute_password(self):
+        self.password = False
+
+    def _inverse_password(self):
+        Users = self.env["res.users"].sudo()
+        for wizard in self:
+            password = wizard.password
+            wizard.sudo().password_hash = (
+                password and Users._hash_passwords([password])[password]
+            )
+
+    def _open_file(self):
+        """Return a binary file object on the uploaded file, read from the
+        filestore rather than decoded in memory when possible"""
+        attachment = (
+            self.env["ir.attachment"]
+            .sudo()
+            .search(
+                [
+                    ("res_model", "=", self._name),
+                    ("res_field", "=", "file"),
+                    ("res_id", "=", self.id),
+                ],
+                limit=1,
+            )
+        )
+        if not attachment:
+            raise UserError("Please upload a file.")
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), "rb")
+        return io.BytesIO(attachment.raw)
+
+    def _iter_rows(self, fileobj):
+        if (self.filename or "").lower().endswith(".xlsx"):
+            return _iter_xlsx_rows(fileobj)
+        return _iter_csv_rows(fileobj)
+
+    def action_import(self):
+        """Match the rows of the file to employees and queue their users.
+
+        Rows are streamed and handled ``chunk_size`` at a time, with one
+        employee query per chunk, so memory use does not grow with the file.
+        """
+        self.ensure_one()
+        if self.chunk_size <= 0:
+            raise UserError("The chunk size must be positive.")
+
+        roles_by_code = {
+            role.code: role for role in self.env["hr.user.role"].search([])
+        }
+        batch = self.env["hr.user.provision.batch"].create(
+            {"name": f"Import of {self.filename or 'file'}"}
+        )
+        match_key, chunk_size = self.match_key, self.chunk_size
+        password_hash = self.sudo().password_hash
+        problems = []
+        skipped = 0
+
+        with self._open_file() as fileobj:
+            rows = self._iter_rows(fileobj)
+            for index, chunk in enumerate(_chunks(rows, chunk_size)):
+                # Data rows start on line 2, after the header
+                entries, chunk_problems = self._prepare_entries(
+                    chunk,
+                    match_key,
+                    roles_by_code,
+                    password_hash,
+                    index * chunk_size + 2,
+                )
+                skipped += len(chunk_problems)
+                problems += chunk_problems[: MAX_REPORTED_PROBLEMS - len(problems)]
+                if entries:
+                    batch._add_requests(entries)
+
+                # Keep the cache from growing with the number of rows
+                self.env.flush_all()
+                self.env.invalidate_all()
+
+        if skipped:
+            batch.note = "\n".join([f"{skipped} rows skipped."] + problems)
+        batch._trigger_processing()
+
+        # Done with the wizard, drop its row, the password hash and the file,
+        # which may hold passwords, with it
+        self.unlink()
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": "hr.user.provision.batch",
+            "res_id": batch.id,
+            "view_mode": "form",
+            "target": "current",
+        }
+
+    @api.model
+    def _prepare_entries(
+        self, rows, match_key, roles_by_code, password_hash, first_row
+    ):
+        """Turn a chunk of rows into provisioning entries.
+
+        Rows without a password of their own get ``password_hash``, the hash
+        of the default password.
+
+        :return: tuple ``(entries, problems)``, one problem message per row
+            that could not be matched or whose password the policy refuses
+        """
+        keys = {row.get(match_key, "").strip() for row in rows} - {""}
+        employees = self.env["hr.employee"].search_fetch(
+            [(match_key, "in", list(keys))],
+            [match_key, "name", "work_email", "user_id"],
+        )
+        employees_by_key = {employee[match_key]: employee for employee in employees}
+
+        Users = self.env["res.users"]
+        entries = []
+        problems = []
+        for row_number, row in enumerate(rows, start=first_row):
+            key = row.get(match_key, "").strip()
+            employee = employees_by_key.get(key)
+            if not employee:
+                problems.append(
+                    f"Row {row_number}: no employee with {match_key} '{key}'."
+                )
+                continue
+            if employee.user_id:
+                problems.append(
+                    f"Row {row_number}: {employee.name} already has a user."
+                )
+                continue
+
+            codes = {code.strip() for code in re.split(r"[,;]", row.get("roles", ""))}
+            codes.discard("")
+            unknown = codes - roles_by_code.keys()
+            if not codes or unknown:
+                problems.append(
+                    f"Row {row_number}: unknown or missing roles "
+                    f"{', '.join(sorted(unknown))}."
+                )
+                continue
+
+            login = row.get("login", "").strip() or employee.work_email
+            if not login:
+                problems.append(f"Row {row_number}: no login for {employee.name}.")
+                continue
+
+            row_password = row.get("password", "").strip()
+            rejected = Users._get_rejected_passwords([row_password], [login])
+            if rejected:
+                problems.append(
+                    f"Row {row_number}: password refused. "
+                    + " ".join(rejected[row_password, login])
+                )
+                continue
+
+            roles = self.env["hr.user.role"].union(
+                *(roles_by_code[code] for code in codes)
+            )
+            entry = {"employee": employee, "login": login, "roles": roles}
+            if row_password:
+                entry["password"] = row_password
+            else:
+                entry["password_hash"] = password_hash
+            entries.append(entry)
+        return entries, problems
@@ -0,0 +1,162 @@
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from odoo import models, fields, api
+from odoo.tools.profiler import Profiler
+from odoo.tools.speedscope import Speedscope
+
+_logger = logging.getLogger(__name__)
+
+# Phases of the sampled action running in the current context, if any
+_current_phases = ContextVar("user_management_phases", default=None)
+
+
+class UserInstrumentationMixin(models.AbstractModel):
+    _name = "hr.user.instrumentation.mixin"
+    _description = "User Management Instrumentation"
+
+    @api.model
+    def _is_instrumentation_sampled(self):
+        """Draw whether to instrument this call, according to the system
+        parameter ``user_management_module.instrumentation_sample_rate``
+        (0 to 1, off by default)"""
+        rate = (
+            self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("user_management_module.instrumentation_sample_rate")
+        )
+        try:
+            rate = float(rate or 0)
+        except ValueError:
+            return False
+        return rate > 0 and random.random() < rate
+
+    @contextmanager
+    def _instrument_action(self, action):
+        """Record the phases run within the block and log them as one JSON
+        line, for the sampled calls only.
+
+        Nested actions are recorded as part of the outer one.
+        """
+        if _current_phases.get() is not None or not self._is_instrumentation_sampled():
+            yield
+            return
+
+        thread = threading.current_thread()
+        if not hasattr(thread, "query_time"):
+            # Maintained by the cursor once present, as for HTTP requests
+            thread.query_count = 0
+            thread.query_time = 0.0
+
+        phases = []
+        token = _current_phases.set(phases)
+        queries, sql_time = self.env.cr.sql_log_count, thread.query_time
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            _current_phases.reset(token)
+            duration = time.perf_counter() - start
+            sql_time = thread.query_time - sql_time
+            _logger.info(
+                "%s",
+                json.dumps(
+                    {
+                        "action": action,
+                        "model": self._name,
+                        "ids": self.ids,
+                        "db": self.env.cr.dbname,
+                        "uid": self.env.uid,
+                        "failed": failed,
+                        "queries": self.env.cr.sql_log_count - queries,
+                        "sql_time": round(sql_time, 6),
+                        "python_time": round(duration - sql_time, 6),
+                        "phases": phases,
+                    }
+                ),
+            )
+
+    @contextmanager
+    def _instrument_phase(self, phase):
+        """Measure the block as ``phase`` of the action being instrumented.
+
+        Pending writes are flushed at the end of the block, so their queries
+        are charged to the phase that made them. A no-op when the current
+        action is not sampled.
+        """
+        phases = _current_phases.get()
+        if phases is None:
+            yield
+            return
+
+        thread = threading.current_thread()
+        queries, sql_time = self.env.cr.sql_log_count, thread.query_time
+        start = time.perf_counter()
+        try:
+            yield
+            self.env.flush_all()
+        finally:
+            duration = time.perf_counter() - start
+            sql_time = thread.query_time - sql_time
+            phases.append(
+                {
+                    "phase": phase,
+                    "queries": self.env.cr.sql_log_count - queries,
+                    "sql_time": round(sql_time, 6),
+                    "python_time": round(duration - sql_time, 6),
+                }
+            )
+
+    @api.model
+    def _is_profiling_enabled(self):
+        """Profile when the context key ``user_management_profile`` or the
+        system parameter ``user_management_module.profile_actions`` is set"""
+        return bool(
+            self.env.context.get("user_management_profile")
+            or self.env["ir.config_parameter"]
+            .sudo()
+            .get_param("user_management_module.profile_actions")
+        )
+
+    @contextmanager
+    def _profile_action(self, action, employee):
+        """Profile the block and attach the result to ``employee`` as a
+        Speedscope file, when profiling is enabled"""
+        if not employee or not self._is_profiling_enabled():
+            yield
+            return
+
+        profiler = Profiler(
+            collectors=["sql", "traces_async"],
+            db=None,
+            description=f"{self._name} {action}",
+        )
+        with profiler:
+            yield
+
+        speedscope = Speedscope(init_stack_trace=profiler.init_stack_trace)
+        for collector in profiler.collectors:
+            if collector.entries:
+                speedscope.add(collector.name, collector.entries)
+        profile = speedscope.add_default().make()
+
+        now = fields.Datetime.now()
+        self.env["ir.attachment"].sudo().create(
+            {
+                "name": f"{action}_{now:%Y%m%d_%H%M%S}.speedscope.json",
+                "res_model": employee._name,
+                "res_id": employee.id,
+                "mimetype": "application/json",
+                "raw": json.dumps(profile).encode(),
+            }
+        )
+        _logger.info(
+            "Profile of %s %s attached to %s", self._name, action, employee
+        )
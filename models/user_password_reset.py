@@ -0,0 +1,73 @@
+import secrets
+from datetime import timedelta
+
+from odoo import models, fields
+from odoo.exceptions import AccessDenied
+
+# Time left to download the export once the reset is requested
+EXPORT_VALIDITY = timedelta(minutes=15)
+
+
+class HrUserPasswordReset(models.TransientModel):
+    _name = "hr.user.password.reset"
+    _description = "One-Time Password Reset Export"
+
+    token = fields.Char(
+        required=True,
+        readonly=True,
+        copy=False,
+        default=lambda self: secrets.token_urlsafe(32),
+    )
+    user_ids = fields.Many2many("res.users", string="Users", readonly=True)
+    used = fields.Boolean(readonly=True)
+
+    def _get_export_url(self):
+        self.ensure_one()
+        return f"/user_management/password_reset/{self.token}"
+
+    def _check_pending(self):
+        """Raise ``AccessDenied`` unless the export is the current user's, is
+        still pending within ``EXPORT_VALIDITY``, and they may still reset
+        the password of every user of the export"""
+        self.ensure_one()
+        if (
+            self.used
+            or self.create_uid != self.env.user
+            or self.create_date < fields.Datetime.now() - EXPORT_VALIDITY
+            or self.user_ids._filter_more_privileged()
+        ):
+            raise AccessDenied()
+
+    def _reset_passwords(self):
+        """Give the users new generated passwords and return them.
+
+        The hashes are computed in parallel and stored by one statement, and
+        the sessions of the users are invalidated once for all. Only the
+        requester can run it, once, within ``EXPORT_VALIDITY``, and only while
+        they may still reset the password of every user of the export.
+        Generated passwords are random, the password policy does not apply.
+
+        :return: list of ``(login, name, password)`` tuples
+        """
+        self._check_pending()
+        # Atomic, a concurrent download of the same export gets nothing
+        self.env.cr.execute(
+            "UPDATE hr_user_password_reset SET used = true"
+            " WHERE id = %s AND used IS NOT true RETURNING id",
+            [self.id],
+        )
+        if not self.env.cr.fetchone():
+            raise AccessDenied()
+        self.invalidate_recordset(["used"])
+
+        users = self.user_ids.sudo()
+        passwords = {user.id: secrets.token_urlsafe(15) for user in users}
+        Users = self.env["res.users"].sudo()
+        hashes = Users._hash_passwords(passwords.values(), check_policy=False)
+        Users._set_encrypted_passwords(
+            {user_id: hashes[password] for user_id, password in passwords.items()}
+        )
+        # Session tokens derive from the password hash, drop the cached ones
+        self.env.registry.clear_cache()
+
+        return [(user.login, user.name, passwords[user.id]) for user in users]
@@ -0,0 +1,256 @@
+import logging
+import threading
+from collections import Counter
+
+from odoo import models, fields, api
+
+from .bulk_mode import deferred_cache_invalidation
+
+_logger = logging.getLogger(__name__)
+
+
+class HrUserProvisionBatch(models.Model):
+    _name = "hr.user.provision.batch"
+    _description = "User Provisioning Batch"
+    _order = "id desc"
+
+    name = fields.Char(required=True)
+    state = fields.Selection(
+        [("pending", "Pending"), ("running", "Running"), ("done", "Done")],
+        default="pending",
+        required=True,
+    )
+    request_ids = fields.One2many(
+        "hr.user.provision.request", "batch_id", string="Requests"
+    )
+    # Progress counters are stored and refreshed once per processed chunk, so
+    # polling them is a single read of this row.
+    total_count = fields.Integer(string="Total", readonly=True)
+    done_count = fields.Integer(string="Done", readonly=True)
+    failed_count = fields.Integer(string="Failed", readonly=True)
+    remaining_count = fields.Integer(
+        string="Remaining", compute="_compute_remaining_count"
+    )
+    throughput = fields.Float(
+        string="Throughput (users/s)", digits=(16, 1), readonly=True
+    )
+    date_start = fields.Datetime(string="Started", readonly=True)
+    date_end = fields.Datetime(string="Finished", readonly=True)
+    note = fields.Text(readonly=True)
+
+    @api.depends("total_count", "done_count", "failed_count")
+    def _compute_remaining_count(self):
+        for batch in self:
+            batch.remaining_count = (
+                batch.total_count - batch.done_count - batch.failed_count
+            )
+
+    @api.model
+    def _enqueue(self, entries, name=None):
+        """Queue the provisioning of ``entries`` and return the new batch.
+
+        :param entries: list of dicts with keys ``employee`` (hr.employee),
+            ``login``, ``roles`` (hr.user.role) and either ``password`` or
+            ``password_hash`` (already hashed with the users crypt context)
+        """
+        batch = self.create({"name": name or f"Provisioning of {len(entries)} users"})
+        batch._add_requests(entries)
+        batch._trigger_processing()
+        return batch
+
+    def _add_requests(self, entries):
+        """Append ``entries`` to the batch, see :meth:`_enqueue`.
+
+        Passwords are hashed here unless given hashed, so plaintext never
+        reaches the queue. A password shared by several entries is hashed
+        only once. Entries whose password the password policy refuses, e.g.
+        because it contains their login, are queued as failed, with the
+        reasons, and do not prevent the others.
+        """
+        self.ensure_one()
+        Users = self.env["res.users"]
+        passwords = [entry.get("password") for entry in entries]
+        logins = [Users._normalize_login(entry["login"]) for entry in entries]
+        rejected = Users._get_rejected_passwords(passwords, logins)
+        hashes = Users._hash_passwords(
+            [
+                password
+                for password, login in zip(passwords, logins)
+                if (password, login) not in rejected
+            ],
+            check_policy=False,
+        )
+
+        vals_list = []
+        for entry, password, login in zip(entries, passwords, logins):
+            vals = {
+                "batch_id": self.id,
+                "employee_id": entry["employee"].id,
+                "login": entry["login"].strip(),
+                "role_ids": [(6, 0, entry["roles"].ids)],
+                "password_hash": entry.get("password_hash") or hashes.get(password),
+            }
+            if (password, login) in rejected:
+                # The same password may be valid for another login
+                vals["password_hash"] = False
+                vals["state"] = "failed"
+                vals["error"] = " ".join(
+                    ["This password cannot be used."] + rejected[password, login]
+                )
+            vals_list.append(vals)
+        self.env["hr.user.provision.request"].create(vals_list)
+        self.total_count += len(entries)
+
+    @api.model
+    def _trigger_processing(self):
+        self.env.ref(
+            "user_management_module.ir_cron_process_provision_requests"
+        )._trigger()
+
+    def get_progress(self):
+        """Return the progress of the batches, cheap enough to be polled"""
+        return [
+            {
+                "id": batch.id,
+                "state": batch.state,
+                "total": batch.total_count,
+                "done": batch.done_count,
+                "failed": batch.failed_count,
+                "remaining": batch.remaining_count,
+                "throughput": batch.throughput,
+            }
+            for batch in self
+        ]
+
+    def _update_progress(self):
+        """Refresh the counters of the batches from their requests"""
+        counts = Counter()
+        for batch, state, count in self.env["hr.user.provision.request"]._read_group(
+            [("batch_id", "in", self.ids)], ["batch_id", "state"], ["__count"]
+        ):
+            counts[batch.id, state] = count
+
+        now = fields.Datetime.now()
+        for batch in self:
+            done = counts[batch.id, "done"]
+            failed = counts[batch.id, "failed"]
+            date_start = batch.date_start or now
+            elapsed = (now - date_start).total_seconds()
+            vals = {
+                "done_count": done,
+                "failed_count": failed,
+                "date_start": date_start,
+                "throughput": done / elapsed if elapsed else 0.0,
+                "state": "running",
+            }
+            if not counts[batch.id, "pending"]:
+                vals.update(state="done", date_end=now)
+            batch.write(vals)
+
+
+class HrUserProvisionRequest(models.Model):
+    _name = "hr.user.provision.request"
+    _description = "User Provisioning Request"
+    _order = "id"
+
+    batch_id = fields.Many2one(
+        "hr.user.provision.batch", required=True, ondelete="cascade", index=True
+    )
+    employee_id = fields.Many2one("hr.employee", required=True, ondelete="cascade")
+    login = fields.Char(required=True)
+    role_ids = fields.Many2many("hr.user.role", string="User Roles")
+    password_hash = fields.Char(groups="base.group_system", copy=False)
+    state = fields.Selection(
+        [("pending", "Pending"), ("done", "Done"), ("failed", "Failed")],
+        default="pending",
+        required=True,
+        index=True,
+    )
+    error = fields.Text(readonly=True)
+
+    @api.model
+    def _cron_process_requests(self):
+        """Provision pending requests in chunks, committing after each one"""
+        ICP = self.env["ir.config_parameter"].sudo()
+        chunk_size = int(
+            ICP.get_param("user_management_module.provision_chunk_size", 100)
+        )
+        max_chunks = int(
+            ICP.get_param("user_management_module.provision_chunks_per_run", 10)
+        )
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+
+        for __ in range(max_chunks):
+            requests = self.sudo().search([("state", "=", "pending")], limit=chunk_size)
+            if not requests:
+                break
+            requests.batch_id.filtered(lambda batch: not batch.date_start).write(
+                {"date_start": fields.Datetime.now(), "state": "running"}
+            )
+            with deferred_cache_invalidation(self.env):
+                requests._process()
+            requests.batch_id._update_progress()
+            if auto_commit:
+                self.env.cr.commit()
+        else:
+            # More work left, run again right away instead of waiting
+            if self.sudo().search_count([("state", "=", "pending")], limit=1):
+                self.env["hr.user.provision.batch"]._trigger_processing()
+
+    def _process(self):
+        """Provision the requests of ``self`` as one batch.
+
+        Conflicting logins are failed upfront. The remaining requests are
+        created together; if that fails, each one is retried in its own
+        savepoint so that a single bad record does not fail the others.
+        """
+        normalize_login = self.env["res.users"]._normalize_login
+        counts = Counter(normalize_login(login) for login in self.mapped("login"))
+        taken = self.env["res.users"]._get_existing_logins(list(counts))
+        invalid = self.filtered(
+            lambda request: counts[normalize_login(request.login)] > 1
+            or normalize_login(request.login) in taken
+            or request.employee_id.user_id
+        )
+        invalid.write(
+            {
+                "state": "failed",
+                "error": "Login already used or employee already has a user.",
+                "password_hash": False,
+            }
+        )
+
+        todo = self - invalid
+        if not todo:
+            return
+
+        try:
+            with self.env.cr.savepoint():
+                todo._provision()
+        except Exception:
+            _logger.info(
+                "Batch provisioning of %d requests failed, retrying one by one",
+                len(todo),
+            )
+            for request in todo:
+                try:
+                    with self.env.cr.savepoint():
+                        request._provision()
+                except Exception as e:
+                    request.write(
+                        {"state": "failed", "error": str(e), "password_hash": False}
+                    )
+
+    def _provision(self):
+        self.env["hr.employee"]._provision_users(
+            [
+                {
+                    "employee": request.employee_id,
+                    "login": request.login,
+                    "password_hash": request.password_hash,
+                    "roles": request.role_ids,
+                }
+                for request in self
+            ]
+        )
+        self.write({"state": "done", "error": False, "password_hash": False})
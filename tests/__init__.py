@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+
+from . import test_role_group_resolution
+from . import test_bulk_provisioning
+from . import test_provision_queue
+from . import test_user_import
+from . import test_provisioning_benchmark
+from . import test_update_user
+from . import test_performance
+from . import test_instrumentation
+from . import test_role_groups_endpoint
+from . import test_employee_user_required
+from . import test_deprovisioning
+from . import test_role_drift
+from . import test_role_reapply
+from . import test_password_reset
+from . import test_password_policy
+from . import test_wizard_credentials
+from . import test_login_normalization
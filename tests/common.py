@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase
+
+# Machine-readable timings, one JSON object per line
+BENCHMARK_FILE = os.environ.get(
+    "USER_MANAGEMENT_BENCHMARK_FILE",
+    os.path.join(tempfile.gettempdir(), "user_management_module_benchmarks.jsonl"),
+)
+
+# Password of the users provisioned by the fixtures below
+FIXTURE_PASSWORD = "Fixture-Passw0rd!"
+
+
+def provision_users(env, employees, roles, logins=None, password=FIXTURE_PASSWORD):
+    """Give each of ``employees`` a user, through ``_provision_users``.
+
+    :param roles: hr.user.role records given to every employee, or a list
+        with the roles of each employee
+    :param logins: one login per employee, defaults to their work emails
+    :return: the created users, in the order of ``employees``
+    """
+    if not isinstance(roles, list):
+        roles = [roles] * len(employees)
+    if logins is None:
+        logins = employees.mapped("work_email")
+    return env["hr.employee"]._provision_users(
+        [
+            {
+                "employee": employee,
+                "login": login,
+                "password": password,
+                "roles": employee_roles,
+            }
+            for employee, login, employee_roles in zip(employees, logins, roles)
+        ]
+    )
+
+
+def create_provisioned_employees(env, name, count, roles, password=FIXTURE_PASSWORD):
+    """Create ``count`` employees named "``name`` Employee <index>" with the
+    work email "``name``<index>@example.com" in lower case, and give each
+    of them a user, see :func:`provision_users`.
+
+    :return: tuple ``(employees, users)``
+    """
+    employees = env["hr.employee"].create(
+        [
+            {
+                "name": f"{name} Employee {index}",
+                "work_email": f"{name.lower()}{index}@example.com",
+            }
+            for index in range(count)
+        ]
+    )
+    return employees, provision_users(env, employees, roles, password=password)
+
+
+class ProvisioningBenchmarkCase(TransactionCase):
+    """Base class for benchmarks, records every measure to BENCHMARK_FILE"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls._benchmark_results = []
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._benchmark_results:
+            with open(BENCHMARK_FILE, "a", encoding="utf-8") as file:
+                for result in cls._benchmark_results:
+                    file.write(json.dumps(result) + "\n")
+        super().tearDownClass()
+
+    @contextmanager
+    def _measure(self, name=None):
+        """Measure SQL statements, registry cache clears and wall time of the
+        block; the measure is recorded when ``name`` is given"""
+        registry = self.env.registry
+        clear_cache = registry.clear_cache
+        stats = {"queries": 0, "cache_clears": 0, "seconds": 0.0}
+
+        def counting_clear_cache(*cache_names):
+            stats["cache_clears"] += 1
+            return clear_cache(*cache_names)
+
+        self.env.flush_all()
+        with patch.object(registry, "clear_cache", counting_clear_cache):
+            start_queries = self.cr.sql_log_count
+            start = time.perf_counter()
+            yield stats
+            self.env.flush_all()
+            stats["seconds"] = time.perf_counter() - start
+            stats["queries"] = self.cr.sql_log_count - start_queries
+
+        if name:
+            self._benchmark_results.append(
+                {
+                    "benchmark": f"{type(self).__name__}.{name}",
+                    "timestamp": time.time(),
+                    **stats,
+                }
+            )
+
+    @contextmanager
+    def _benchmark(self, name, query_budget):
+        """Assert the block stays within ``query_budget`` and record it"""
+        with self.assertQueryCount(query_budget), self._measure(name) as stats:
+            yield stats
@@ -0,0 +1,161 @@
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestBulkProvisioning(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.role_purchase = cls.env.ref("user_management_module.role_purchase")
+        cls.employees = cls.env["hr.employee"].create(
+            [
+                {"name": f"Bulk Employee {index}", "work_email": f"bulk{index}@example.com"}
+                for index in range(5)
+            ]
+        )
+
+    def _run_wizard(self, employees, roles):
+        wizard = (
+            self.env["hr.bulk.create.user.wizard"]
+            .with_context(active_model="hr.employee", active_ids=employees.ids)
+            .create(
+                {
+                    "password": "Bulk-Passw0rd!",
+                    "confirm_password": "Bulk-Passw0rd!",
+                    "user_role_ids": [(6, 0, roles.ids)],
+                }
+            )
+        )
+        self.assertEqual(wizard.employee_ids, employees)
+        return wizard.action_create_users()
+
+    def test_bulk_create_users(self):
+        roles = self.role_sales | self.role_purchase
+        self._run_wizard(self.employees, roles)
+
+        expected_group_ids = set(self.role_sales.group_ids.ids) | set(
+            self.role_purchase.group_ids.ids
+        )
+        for employee in self.employees:
+            self.assertEqual(employee.user_id.login, employee.work_email)
+            self.assertEqual(employee.x_user_role_ids, roles)
+            self.assertLessEqual(expected_group_ids, set(employee.user_id.groups_id.ids))
+
+    def test_bulk_skips_employees_with_user(self):
+        self._run_wizard(self.employees[:2], self.role_purchase)
+        users = self.employees[:2].user_id
+
+        self._run_wizard(self.employees, self.role_purchase)
+        self.assertEqual(self.employees[:2].user_id, users)
+        self.assertTrue(all(self.employees.mapped("user_id")))
+
+    def test_bulk_roles_written_per_role_set(self):
+        Employee = type(self.env["hr.employee"])
+        write = Employee.write
+        role_writes = []
+
+        def spy_write(records, vals):
+            if "x_user_role_ids" in vals:
+                role_writes.append(records)
+            return write(records, vals)
+
+        both = self.role_sales | self.role_purchase
+        entries = [
+            {
+                "employee": employee,
+                "login": employee.work_email,
+                "password": "Bulk-Passw0rd!",
+                "roles": self.role_purchase if index == 3 else both,
+            }
+            for index, employee in enumerate(self.employees[:4])
+        ]
+        with patch.object(Employee, "write", spy_write):
+            self.env["hr.employee"]._provision_users(entries)
+
+        # The only holder of its role set gets a single write, shared role
+        # sets are written once for all their holders
+        self.assertEqual(len(role_writes), 2)
+        self.assertEqual(role_writes[0], self.employees[3])
+        self.assertEqual(role_writes[1], self.employees[:3])
+        self.assertEqual(self.employees[:3].x_user_role_ids, both)
+        self.assertEqual(self.employees[3].x_user_role_ids, self.role_purchase)
+
+    def test_single_entry_written_once(self):
+        Employee = type(self.env["hr.employee"])
+        write = Employee.write
+        writes = []
+
+        def spy_write(records, vals):
+            writes.append((records, set(vals)))
+            return write(records, vals)
+
+        employee = self.employees[0]
+        with patch.object(Employee, "write", spy_write):
+            self.env["hr.employee"]._provision_users(
+                [
+                    {
+                        "employee": employee,
+                        "login": employee.work_email,
+                        "password": "Bulk-Passw0rd!",
+                        "roles": self.role_sales,
+                    }
+                ]
+            )
+
+        self.assertEqual(writes, [(employee, {"user_id", "x_user_role_ids"})])
+        self.assertEqual(employee.x_user_role_ids, self.role_sales)
+
+    def test_bulk_login_conflicts(self):
+        self.env["res.users"].create(
+            {"name": "Taken", "login": self.employees[0].work_email}
+        )
+        with self.assertRaises(UserError):
+            self._run_wizard(self.employees, self.role_purchase)
+        self.assertFalse(self.employees.user_id)
+
+        duplicates = self.employees[1:3]
+        duplicates.write({"work_email": "same@example.com"})
+        with self.assertRaises(UserError):
+            self._run_wizard(duplicates, self.role_purchase)
+
+    def test_bulk_unlink_users(self):
+        self._run_wizard(self.employees[:3], self.role_purchase)
+        users = self.employees.user_id
+        self.assertEqual(len(users), 3)
+
+        action = self.employees.action_unlink_user()
+        self.assertFalse(self.employees.user_id)
+        self.assertFalse(users.exists())
+        self.assertEqual(action["tag"], "display_notification")
+        self.assertIn("3 users have been deleted", action["params"]["message"])
+        self.assertIn("2 employees had no linked user", action["params"]["message"])
+
+        with self.assertRaises(UserError):
+            self.employees.action_unlink_user()
+
+    def test_parallel_password_hashing(self):
+        Users = self.env["res.users"]
+        passwords = [f"Bulk-Passw0rd-{index}!" for index in range(8)]
+        hashes = Users._hash_passwords(passwords + passwords[:2] + [False])
+        self.assertEqual(set(hashes), set(passwords))
+
+        crypt_context = Users._crypt_context()
+        for password, hashed in hashes.items():
+            self.assertTrue(crypt_context.verify(password, hashed))
+
+        self._run_wizard(self.employees, self.role_purchase)
+        users = self.employees.user_id
+        with self.assertQueryCount(1):
+            Users._set_encrypted_passwords(
+                {user.id: hashes[password] for user, password in zip(users, passwords)}
+            )
+        self.env.cr.execute(
+            "SELECT id, password FROM res_users WHERE id IN %s", [tuple(users.ids)]
+        )
+        stored = dict(self.env.cr.fetchall())
+        for user, password in zip(users, passwords):
+            self.assertTrue(crypt_context.verify(password, stored[user.id]))
@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, new_test_user, tagged
+
+from odoo.addons.user_management_module.models import hr_employee
+
+from .common import create_provisioned_employees
+
+
+@tagged("post_install", "-at_install")
+class TestDeprovisioning(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.employees, cls.users = create_provisioned_employees(
+            cls.env, "Leaving", 3, cls.role_sales
+        )
+        cls.ICP = cls.env["ir.config_parameter"].sudo()
+
+    def test_archive_mode(self):
+        action = self.employees.with_context(
+            deprovision_mode="archive"
+        ).action_unlink_user()
+        self.assertIn("3 users have been archived", action["params"]["message"])
+
+        self.assertFalse(self.employees.user_id)
+        for employee, user in zip(self.employees, self.users):
+            self.assertEqual(employee.x_former_user_id, user)
+        self.assertTrue(self.users.exists())
+        self.assertFalse(any(self.users.mapped("active")))
+        self.assertTrue(all(self.users.mapped("x_deprovision_date")))
+        for user in self.users:
+            self.assertEqual(user.groups_id, self.env.ref("base.group_user"))
+
+    def test_notification_lists_first_names(self):
+        with patch.object(hr_employee, "NOTIFIED_USER_NAMES", 2):
+            action = self.employees.with_context(
+                deprovision_mode="archive"
+            ).action_unlink_user()
+        names = ", ".join(self.users[:2].mapped("name"))
+        self.assertIn(f"{names} and 1 more.", action["params"]["message"])
+        self.assertNotIn(self.users[2].name, action["params"]["message"])
+
+    def test_more_privileged_users_refused(self):
+        officer = new_test_user(
+            self.env, login="leaving.officer", groups="base.group_user,hr.group_hr_user"
+        )
+        with self.assertRaises(UserError):
+            self.employees.with_user(officer).action_unlink_user()
+        self.assertEqual(self.employees.user_id, self.users)
+        self.assertTrue(all(self.users.mapped("active")))
+
+    def test_archive_mode_from_system_parameter(self):
+        self.ICP.set_param("user_management_module.deprovision_mode", "archive")
+        self.employees[0].action_unlink_user()
+        self.assertTrue(self.users[0].exists())
+        self.assertFalse(self.users[0].active)
+
+    def test_purge_deprovisioned(self):
+        self.employees.with_context(deprovision_mode="archive").action_unlink_user()
+        self.users[0].x_deprovision_date = fields.Datetime.now() - timedelta(days=40)
+
+        # Disabled by default
+        self.env["res.users"]._cron_purge_deprovisioned()
+        self.assertEqual(len(self.users.exists()), 3)
+
+        self.ICP.set_param("user_management_module.purge_deprovisioned_after_days", 30)
+        self.ICP.set_param("user_management_module.purge_chunk_size", 1)
+        self.env["res.users"]._cron_purge_deprovisioned()
+        self.assertEqual(self.users.exists(), self.users[1:])
+        self.assertFalse(self.employees[0].x_former_user_id)
@@ -0,0 +1,48 @@
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestEmployeeUserRequired(TransactionCase):
+    def _require_user(self, value):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.require_employee_user", value
+        )
+
+    def _create_user(self, login):
+        return self.env["res.users"].create({"name": login, "login": login})
+
+    def test_not_enforced_by_default(self):
+        employee = self.env["hr.employee"].create({"name": "No User"})
+        self.assertFalse(employee.user_id)
+        self.assertFalse(employee.x_user_required)
+
+    def test_enforced_on_create(self):
+        self._require_user("True")
+        with self.assertRaises(ValidationError):
+            self.env["hr.employee"].create({"name": "No User"})
+
+        employee = self.env["hr.employee"].create(
+            {"name": "Linked User", "user_id": self._create_user("linked.user").id}
+        )
+        # The form requires the user along with the server
+        self.assertTrue(employee.x_user_required)
+
+    def test_enforced_when_user_removed(self):
+        self._require_user("True")
+        employee = self.env["hr.employee"].create(
+            {"name": "Linked User", "user_id": self._create_user("removed.user").id}
+        )
+        with self.assertRaises(ValidationError):
+            employee.write({"user_id": False})
+
+        employee.write({"user_id": self._create_user("other.user").id})
+        self.assertEqual(employee.user_id.login, "other.user")
+
+    def test_deprovisioning_allowed(self):
+        self._require_user("True")
+        employee = self.env["hr.employee"].create(
+            {"name": "Linked User", "user_id": self._create_user("unlinked.user").id}
+        )
+        employee.action_unlink_user()
+        self.assertFalse(employee.user_id)
@@ -0,0 +1,113 @@
+import json
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from odoo.addons.user_management_module.models import user_instrumentation
+
+INSTRUMENTATION_LOGGER = "odoo.addons.user_management_module.models.user_instrumentation"
+
+
+@tagged("post_install", "-at_install")
+class TestInstrumentation(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.employee = cls.env["hr.employee"].create({"name": "Traced Employee"})
+        cls.wizard = cls.env["hr.create.user.wizard"].create(
+            {
+                "employee_id": cls.employee.id,
+                "login": "traced@example.com",
+                "password": "x" * 12,
+                "confirm_password": "x" * 12,
+                "user_role_ids": [(6, 0, cls.role_sales.ids)],
+            }
+        )
+
+    def _set_sample_rate(self, rate):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.instrumentation_sample_rate", rate
+        )
+
+    def _records(self, logs):
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_create_user_phases_logged(self):
+        self._set_sample_rate("1")
+        with self.assertLogs(INSTRUMENTATION_LOGGER, "INFO") as logs:
+            self.wizard._create_new_user()
+
+        [record] = self._records(logs)
+        self.assertEqual(record["action"], "create_user")
+        self.assertFalse(record["failed"])
+        self.assertEqual(
+            [phase["phase"] for phase in record["phases"]],
+            [
+                "check_logins",
+                "resolve_groups",
+                "hash_passwords",
+                "create_users",
+                "link_employees",
+            ],
+        )
+        for phase in record["phases"]:
+            self.assertGreaterEqual(phase["queries"], 0)
+            self.assertGreaterEqual(phase["python_time"], 0)
+        self.assertGreaterEqual(
+            record["queries"], sum(phase["queries"] for phase in record["phases"])
+        )
+
+    def test_unlink_user_phases_logged(self):
+        self.wizard._create_new_user()
+        self._set_sample_rate("1")
+        with self.assertLogs(INSTRUMENTATION_LOGGER, "INFO") as logs:
+            self.employee.action_unlink_user()
+
+        [record] = self._records(logs)
+        self.assertEqual(record["action"], "unlink_user")
+        self.assertEqual(record["ids"], self.employee.ids)
+        self.assertEqual(
+            [phase["phase"] for phase in record["phases"]],
+            ["unlink_employee", "delete_user"],
+        )
+
+    def test_not_sampled(self):
+        self._set_sample_rate("0")
+        with self.assertNoLogs(INSTRUMENTATION_LOGGER, "INFO"):
+            self.wizard._create_new_user()
+        self.assertTrue(self.employee.user_id)
+
+    def _profiles(self):
+        return self.env["ir.attachment"].search(
+            [
+                ("res_model", "=", "hr.employee"),
+                ("res_id", "=", self.employee.id),
+                ("name", "like", ".speedscope.json"),
+            ]
+        )
+
+    def test_profile_attached_when_enabled(self):
+        self.wizard.with_context(user_management_profile=True).action_create_user()
+        self.assertTrue(self.employee.user_id)
+
+        profile = self._profiles()
+        self.assertEqual(len(profile), 1)
+        self.assertTrue(profile.name.startswith("action_create_user_"))
+        self.assertIn("profiles", json.loads(profile.raw))
+
+    def test_profile_onchange_from_system_parameter(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.profile_actions", "1"
+        )
+        wizard = self.env["hr.create.user.wizard"].new(
+            {"employee_id": self.employee.id, "user_role_ids": self.role_sales.ids}
+        )
+        wizard._onchange_user_roles()
+        self.assertTrue(self._profiles().name.startswith("onchange_user_roles_"))
+
+    def test_no_profiler_when_disabled(self):
+        with patch.object(user_instrumentation, "Profiler") as profiler:
+            self.wizard.action_create_user()
+        profiler.assert_not_called()
+        self.assertFalse(self._profiles())
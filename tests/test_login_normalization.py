@@ -0,0 +1,81 @@
+from odoo import tools
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+from .common import provision_users
+
+
+@tagged("post_install", "-at_install")
+class TestLoginNormalization(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Users = cls.env["res.users"]
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.employees = cls.env["hr.employee"].create(
+            [{"name": f"Case Employee {index}"} for index in range(2)]
+        )
+        # Created outside of the module, with its case kept
+        cls.john = cls.Users.create({"name": "John", "login": "John@Example.com"})
+
+    def _provision(self, employee, login):
+        return provision_users(self.env, employee, self.role_sales, logins=[login])
+
+    def test_lower_login_index(self):
+        self.assertTrue(tools.index_exists(self.env.cr, "res_users_login_lower_index"))
+
+    def test_existing_logins_ignore_case(self):
+        with self.assertQueryCount(1):
+            taken = self.Users._get_existing_logins(
+                [" JOHN@example.com", "jane@example.com", "", False]
+            )
+        self.assertEqual(taken, {"john@example.com"})
+        self.assertFalse(
+            self.Users._get_existing_logins(["john@example.com"], exclude_ids=self.john.ids)
+        )
+
+    def test_provisioning_keeps_login_case(self):
+        user = self._provision(self.employees[0], "  Jane.Doe@Example.COM ")
+        self.assertEqual(user.login, "Jane.Doe@Example.COM")
+        # The login is found at sign-in as it was given
+        self.assertEqual(
+            self.Users.search(self.Users._get_login_domain("Jane.Doe@Example.COM")),
+            user,
+        )
+
+        with self.assertRaisesRegex(UserError, "already exists"):
+            self._provision(self.employees[1], "JOHN@example.com")
+
+    def test_update_login_conflict_ignores_case(self):
+        self._provision(self.employees[0], "jane@example.com")
+        wizard = (
+            self.env["hr.create.user.wizard"]
+            .with_context(default_employee_id=self.employees[0].id)
+            .create(
+                {
+                    "login": "john@EXAMPLE.com",
+                    "user_role_ids": [(6, 0, self.role_sales.ids)],
+                }
+            )
+        )
+        with self.assertRaisesRegex(UserError, "already exists"):
+            wizard.action_create_user()
+
+        wizard.login = "Jane.New@Example.com"
+        wizard.action_create_user()
+        self.assertEqual(self.employees[0].user_id.login, "Jane.New@Example.com")
+
+    def test_update_keeps_unchanged_mixed_case_login(self):
+        self.employees[1].user_id = self.john
+        wizard = (
+            self.env["hr.create.user.wizard"]
+            .with_context(default_employee_id=self.employees[1].id)
+            .create(
+                {
+                    "login": self.john.login,
+                    "user_role_ids": [(6, 0, self.role_sales.ids)],
+                }
+            )
+        )
+        wizard.action_create_user()
+        self.assertEqual(self.john.login, "John@Example.com")
@@ -0,0 +1,129 @@
+import logging
+import os
+import tempfile
+import time
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+
+from odoo.addons.user_management_module.models import password_policy
+from odoo.addons.user_management_module.models.password_policy import BloomFilter
+
+from .common import ProvisioningBenchmarkCase
+
+_logger = logging.getLogger(__name__)
+
+BREACHED = ["123456", "password", "qwerty123", "Summer2024!", "letmein-please"]
+
+
+@tagged("post_install", "-at_install")
+class TestPasswordPolicy(ProvisioningBenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tempdir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(cls.tempdir.cleanup)
+        cls.filter_path = os.path.join(cls.tempdir.name, "breached.bloom")
+        words = BREACHED + [f"filler-{index}" for index in range(10000)]
+        BloomFilter.build(iter(words), len(words), cls.filter_path)
+        cls.Policy = cls.env["hr.user.password.policy"]
+
+    def _use_filter(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.breached_password_filter", self.filter_path
+        )
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(self.filter_path)
+        for password in BREACHED:
+            self.assertIn(password, bloom)
+        false_positives = sum(
+            f"not-breached-{index}" in bloom for index in range(10000)
+        )
+        # Sized for 0.1%, leave room for chance
+        self.assertLess(false_positives, 50)
+
+    def test_policy(self):
+        self.assertEqual(self.Policy._get_password_problems("Correct-Horse-9"), [])
+        self.assertEqual(len(self.Policy._get_password_problems("short")), 1)
+        self.assertEqual(
+            len(self.Policy._get_password_problems("jdoe-secret-1", "jdoe@example.com")),
+            1,
+        )
+        # Too short a name to be looked for
+        self.assertEqual(
+            self.Policy._get_password_problems("Submit-2024!", "it@corp.com"), []
+        )
+
+        # Breached passwords are only refused once a filter is set
+        self.assertEqual(self.Policy._get_password_problems("Summer2024!"), [])
+        self._use_filter()
+        with self.assertRaises(UserError):
+            self.Policy._check_password("Summer2024!")
+        self.Policy._check_password("Correct-Horse-9")
+
+    def test_bulk_hashing_refuses_breached(self):
+        self._use_filter()
+        with self.assertRaises(UserError):
+            self.env["res.users"]._hash_passwords(["Correct-Horse-9", "letmein-please"])
+
+    def test_rejected_passwords_per_entry(self):
+        self._use_filter()
+        rejected = self.env["res.users"]._get_rejected_passwords(
+            ["Correct-Horse-9", "letmein-please", "short", None]
+        )
+        self.assertEqual(set(rejected), {("letmein-please", None), ("short", None)})
+
+        rejected = self.env["res.users"]._get_rejected_passwords(
+            ["jdoe-secret-1", "jdoe-secret-1"], ["jdoe@example.com", "ann@example.com"]
+        )
+        self.assertEqual(set(rejected), {("jdoe-secret-1", "jdoe@example.com")})
+        with self.assertRaises(UserError) as catcher:
+            self.env["res.users"]._hash_passwords(["letmein-please", "short"])
+        # All refused passwords are reported at once
+        self.assertIn("2 of these passwords", str(catcher.exception))
+        self.assertIn("breached", str(catcher.exception))
+        self.assertIn("characters", str(catcher.exception))
+
+    def test_missing_filter_is_ignored(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.breached_password_filter",
+            os.path.join(self.tempdir.name, "missing.bloom"),
+        )
+        with self.assertLogs(password_policy.__name__, "WARNING"):
+            self.assertIsNone(self.Policy._get_breached_filter())
+        self.assertEqual(self.Policy._get_password_problems("Summer2024!"), [])
+
+    def test_replaced_filter_is_reopened(self):
+        path = os.path.join(self.tempdir.name, "replaced.bloom")
+        BloomFilter.build(iter(["first-breached"]), 1, path)
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.breached_password_filter", path
+        )
+        self.addCleanup(password_policy._bloom_filters.pop, path, None)
+        first = self.Policy._get_breached_filter()
+        self.assertIn("first-breached", first)
+
+        BloomFilter.build(iter(["second-breached"]), 1, path)
+        mtime = os.stat(path).st_mtime + 1
+        os.utime(path, (mtime, mtime))
+        second = self.Policy._get_breached_filter()
+        self.assertIn("second-breached", second)
+        # Lookups still running on the previous filter are not broken
+        self.assertIsNot(second, first)
+        self.assertIn("first-breached", first)
+
+    def test_lookup_benchmark(self):
+        bloom = BloomFilter(self.filter_path)
+        candidates = [f"candidate-{index}" for index in range(50000)]
+        with self._measure("bloom_filter_lookups") as stats:
+            start = time.perf_counter()
+            for candidate in candidates:
+                candidate in bloom  # noqa: B015
+            stats["lookups_per_second"] = len(candidates) / (
+                time.perf_counter() - start
+            )
+        _logger.info(
+            "Breached password filter: %.0f lookups/s", stats["lookups_per_second"]
+        )
+        self.assertEqual(stats["queries"], 0)
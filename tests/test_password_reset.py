@@ -0,0 +1,110 @@
+import csv
+import io
+import re
+
+from odoo.exceptions import UserError
+from odoo.tests import HttpCase, new_test_user, tagged
+
+from .common import create_provisioned_employees
+
+
+@tagged("post_install", "-at_install")
+class TestPasswordReset(HttpCase):
+    def setUp(self):
+        super().setUp()
+        self.employees, self.users = create_provisioned_employees(
+            self.env, "Reset", 3, self.env.ref("user_management_module.role_sales")
+        )
+        self.admin = self.env.ref("base.user_admin")
+        self.authenticate("admin", "admin")
+
+    def _stored_passwords(self):
+        self.env.cr.execute(
+            "SELECT id, password FROM res_users WHERE id IN %s",
+            [tuple(self.users.ids)],
+        )
+        return dict(self.env.cr.fetchall())
+
+    def _download(self, url):
+        """Confirm the reset on its page, then post the form"""
+        page = self.url_open(url)
+        self.assertEqual(page.status_code, 200)
+        csrf_token = re.search(r'name="csrf_token" value="([^"]+)"', page.text)
+        return self.url_open(url, data={"csrf_token": csrf_token.group(1)})
+
+    def test_reset_and_export_once(self):
+        old_passwords = self._stored_passwords()
+        action = self.employees.with_user(self.admin).action_reset_passwords()
+        # Nothing happens until the export is downloaded
+        self.assertEqual(self._stored_passwords(), old_passwords)
+
+        # Displaying the confirmation page does not reset anything
+        response = self._download(action["url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("attachment", response.headers["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual(
+            {row["login"] for row in rows}, set(self.users.mapped("login"))
+        )
+
+        self.env.invalidate_all()
+        stored = self._stored_passwords()
+        crypt_context = self.env["res.users"]._crypt_context()
+        logins = dict(zip(self.users.mapped("login"), self.users.ids))
+        for row in rows:
+            user_id = logins[row["login"]]
+            self.assertTrue(crypt_context.verify(row["password"], stored[user_id]))
+            self.assertNotEqual(stored[user_id], old_passwords[user_id])
+
+        # One-time
+        response = self.url_open(action["url"])
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_export_requires_csrf_token(self):
+        old_passwords = self._stored_passwords()
+        action = self.employees.with_user(self.admin).action_reset_passwords()
+        response = self.url_open(action["url"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._stored_passwords(), old_passwords)
+
+        response = self.url_open(action["url"], data={"csrf_token": "forged"})
+        self.assertNotEqual(response.status_code, 200)
+        self.assertEqual(self._stored_passwords(), old_passwords)
+
+    def test_reset_refused_for_more_privileged_users(self):
+        officer = new_test_user(
+            self.env, login="reset.officer", groups="base.group_user,hr.group_hr_user"
+        )
+        with self.assertRaises(UserError):
+            self.employees.with_user(officer).action_reset_passwords()
+
+        # Nor can an export created for them be downloaded
+        reset = (
+            self.env["hr.user.password.reset"]
+            .with_user(officer)
+            .create({"user_ids": [(6, 0, self.users.ids)]})
+        )
+        old_passwords = self._stored_passwords()
+        self.authenticate("reset.officer", "reset.officer")
+        response = self.url_open(reset._get_export_url())
+        self.assertNotEqual(response.status_code, 200)
+        self.assertEqual(self._stored_passwords(), old_passwords)
+
+    def test_generated_passwords_skip_policy(self):
+        self.env["ir.config_parameter"].sudo().set_param(
+            "user_management_module.password_min_length", 64
+        )
+        reset = (
+            self.env["hr.user.password.reset"]
+            .with_user(self.admin)
+            .create({"user_ids": [(6, 0, self.users.ids)]})
+        )
+        rows = reset.with_user(self.admin)._reset_passwords()
+        self.assertEqual(len(rows), len(self.users))
+
+    def test_export_of_another_user(self):
+        old_passwords = self._stored_passwords()
+        action = self.employees.action_reset_passwords()
+        response = self.url_open(action["url"])
+        self.assertNotEqual(response.status_code, 200)
+        self.assertEqual(self._stored_passwords(), old_passwords)
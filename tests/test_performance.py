@@ -0,0 +1,159 @@
+from unittest.mock import patch
+
+from odoo.tests import tagged
+
+from .common import ProvisioningBenchmarkCase, provision_users
+
+# Query budgets of the user management flows. Role groups are precomputed, so
+# none of these may depend on the number of rules or categories of a role.
+ROLE_LOOKUP_COLD_QUERY_BUDGET = 2  # role search + group relation
+DEFAULT_GET_CREATE_QUERY_BUDGET = 4
+DEFAULT_GET_UPDATE_QUERY_BUDGET = 8
+ONCHANGE_ROLES_QUERY_BUDGET = 2
+CREATE_USER_QUERY_BUDGET = 90
+UPDATE_USER_QUERY_BUDGET = 20
+UNLINK_USER_QUERY_BUDGET = 120
+
+
+@tagged("post_install", "-at_install")
+class TestUserManagementPerformance(ProvisioningBenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Wizard = cls.env["hr.create.user.wizard"]
+        cls.seeded_roles = cls.env["hr.user.role"].browse(
+            cls.env["ir.model.data"]
+            .search(
+                [
+                    ("module", "=", "user_management_module"),
+                    ("model", "=", "hr.user.role"),
+                ]
+            )
+            .mapped("res_id")
+        )
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.employee = cls.env["hr.employee"].create(
+            {"name": "Perf Employee", "work_email": "perf.employee@example.com"}
+        )
+        cls.employee_with_user = cls.env["hr.employee"].create(
+            {"name": "Perf Employee With User"}
+        )
+        provision_users(
+            cls.env,
+            cls.employee_with_user,
+            cls.role_sales,
+            logins=["perf.user@example.com"],
+        )
+        cls.user = cls.employee_with_user.user_id
+
+    def _warm_role_cache(self):
+        for code in self.seeded_roles.mapped("code"):
+            self.Wizard._get_role_group_ids(code)
+
+    def test_seeded_roles_present(self):
+        self.assertEqual(len(self.seeded_roles), 6)
+
+    def test_get_groups_for_role(self):
+        for role in self.seeded_roles:
+            with self.subTest(role=role.code):
+                self.env.registry.clear_cache()
+                self.env.invalidate_all()
+                with self._benchmark(
+                    f"get_groups_for_role_cold_{role.code}",
+                    ROLE_LOOKUP_COLD_QUERY_BUDGET,
+                ):
+                    group_ids = self.Wizard._get_groups_for_role(role.code)
+                self.assertEqual(set(group_ids), set(role.group_ids.ids))
+
+                with self._benchmark(f"get_groups_for_role_warm_{role.code}", 0):
+                    self.Wizard._get_groups_for_role(role.code)
+
+    def test_default_get_create_mode(self):
+        self.env.invalidate_all()
+        with self._benchmark("default_get_create", DEFAULT_GET_CREATE_QUERY_BUDGET):
+            defaults = self.Wizard.with_context(
+                default_employee_id=self.employee.id
+            ).default_get(["employee_id", "login", "user_role_ids", "groups_id"])
+        self.assertEqual(defaults["login"], "perf.employee@example.com")
+        self.assertNotIn("existing_user_id", defaults)
+
+    def test_default_get_update_mode(self):
+        self.env.invalidate_all()
+        with self._benchmark("default_get_update", DEFAULT_GET_UPDATE_QUERY_BUDGET):
+            defaults = self.Wizard.with_context(
+                default_employee_id=self.employee_with_user.id
+            ).default_get(["employee_id", "login", "user_role_ids", "groups_id"])
+        self.assertEqual(defaults["existing_user_id"], self.user.id)
+        self.assertEqual(defaults["user_role_ids"], [(6, 0, self.role_sales.ids)])
+
+    def test_onchange_user_roles(self):
+        self._warm_role_cache()
+        for count in range(1, len(self.seeded_roles) + 1):
+            roles = self.seeded_roles[:count]
+            with self.subTest(roles=count):
+                wizard = self.Wizard.new(
+                    {"employee_id": self.employee.id, "user_role_ids": roles.ids}
+                )
+                self.env.invalidate_all()
+                with self._benchmark(
+                    f"onchange_user_roles_{count}", ONCHANGE_ROLES_QUERY_BUDGET
+                ):
+                    wizard._onchange_user_roles()
+                self.assertEqual(wizard.groups_id, roles.group_ids)
+
+    def test_onchange_user_roles_incremental(self):
+        resolved = []
+        Wizard = type(self.Wizard)
+        get_role_group_ids = Wizard._get_role_group_ids
+
+        def spy(wizard, role):
+            resolved.append(role)
+            return get_role_group_ids(wizard, role)
+
+        wizard = self.Wizard.new({"employee_id": self.employee.id})
+        with patch.object(Wizard, "_get_role_group_ids", spy):
+            # Tick the roles one by one, then untick the first one
+            for count in range(1, len(self.seeded_roles) + 1):
+                wizard.user_role_ids = self.seeded_roles[:count]
+                wizard._onchange_user_roles()
+                self.assertEqual(wizard.groups_id, wizard.user_role_ids.group_ids)
+            wizard.user_role_ids = self.seeded_roles[1:]
+            wizard._onchange_user_roles()
+
+        self.assertEqual(resolved, self.seeded_roles.mapped("code"))
+        self.assertEqual(wizard.groups_id, self.seeded_roles[1:].group_ids)
+        self.assertEqual(
+            set(wizard.role_group_ids), {str(id_) for id_ in self.seeded_roles[1:].ids}
+        )
+
+    def test_create_new_user(self):
+        self._warm_role_cache()
+        wizard = self.Wizard.create(
+            {
+                "employee_id": self.employee.id,
+                "login": "perf.new@example.com",
+                "password": "x" * 12,
+                "confirm_password": "x" * 12,
+                "user_role_ids": [(6, 0, self.seeded_roles[:3].ids)],
+            }
+        )
+        with self._benchmark("create_new_user", CREATE_USER_QUERY_BUDGET):
+            wizard._create_new_user()
+        self.assertEqual(self.employee.user_id.login, "perf.new@example.com")
+
+    def test_update_existing_user(self):
+        self._warm_role_cache()
+        wizard = self.Wizard.with_context(
+            default_employee_id=self.employee_with_user.id
+        ).create({"user_role_ids": [(6, 0, self.seeded_roles[:3].ids)]})
+        with self._benchmark("update_existing_user", UPDATE_USER_QUERY_BUDGET):
+            wizard._update_existing_user()
+        self.assertEqual(
+            self.employee_with_user.x_user_role_ids, self.seeded_roles[:3]
+        )
+
+    def test_unlink_user(self):
+        with self._benchmark("action_unlink_user", UNLINK_USER_QUERY_BUDGET):
+            self.employee_with_user.action_unlink_user()
+        self.assertFalse(self.employee_with_user.user_id)
+        self.assertFalse(self.user.exists())
@@ -0,0 +1,124 @@
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestProvisionQueue(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_purchase = cls.env.ref("user_management_module.role_purchase")
+        cls.employees = cls.env["hr.employee"].create(
+            [
+                {"name": f"Queued Employee {index}", "work_email": f"queue{index}@example.com"}
+                for index in range(5)
+            ]
+        )
+        cls.env["res.users"].create(
+            {"name": "Taken", "login": cls.employees[0].work_email}
+        )
+
+    def _enqueue(self):
+        return self.env["hr.user.provision.batch"]._enqueue(
+            [
+                {
+                    "employee": employee,
+                    "login": employee.work_email,
+                    "password": "Queue-Passw0rd!",
+                    "roles": self.role_purchase,
+                }
+                for employee in self.employees
+            ]
+        )
+
+    def test_queue_processing(self):
+        self.env["ir.config_parameter"].set_param(
+            "user_management_module.provision_chunk_size", 2
+        )
+        batch = self._enqueue()
+        self.assertEqual(batch.get_progress()[0]["remaining"], 5)
+        self.assertFalse(batch.request_ids.filtered("password_hash") - batch.request_ids)
+
+        self.env["hr.user.provision.request"]._cron_process_requests()
+
+        progress = batch.get_progress()[0]
+        self.assertEqual(batch.state, "done")
+        self.assertEqual((progress["done"], progress["failed"]), (4, 1))
+        self.assertEqual(progress["remaining"], 0)
+
+        failed = batch.request_ids.filtered(lambda request: request.state == "failed")
+        self.assertEqual(failed.employee_id, self.employees[0])
+        self.assertFalse(self.employees[0].user_id)
+        self.assertFalse(batch.request_ids.filtered("password_hash"))
+
+        crypt_context = self.env["res.users"]._crypt_context()
+        for employee in self.employees[1:]:
+            self.assertEqual(employee.user_id.login, employee.work_email)
+            self.assertEqual(employee.x_user_role_ids, self.role_purchase)
+            self.env.cr.execute(
+                "SELECT password FROM res_users WHERE id = %s", [employee.user_id.id]
+            )
+            self.assertTrue(
+                crypt_context.verify("Queue-Passw0rd!", self.env.cr.fetchone()[0])
+            )
+
+    def test_bad_record_does_not_fail_the_chunk(self):
+        batch = self._enqueue()
+        bad_employee = self.employees[2]
+        HrEmployee = type(self.env["hr.employee"])
+        provision_users = HrEmployee._provision_users
+
+        def _provision_users(model, entries):
+            if any(entry["employee"] == bad_employee for entry in entries):
+                raise ValueError("Simulated failure")
+            return provision_users(model, entries)
+
+        self.patch(HrEmployee, "_provision_users", _provision_users)
+        self.env["hr.user.provision.request"]._cron_process_requests()
+
+        failed = batch.request_ids.filtered(lambda request: request.state == "failed")
+        self.assertEqual(failed.employee_id, self.employees[0] | bad_employee)
+        self.assertEqual(batch.done_count, 3)
+        self.assertFalse(bad_employee.user_id)
+        self.assertTrue(self.employees[3].user_id)
+
+    def test_refused_password_fails_its_request_only(self):
+        batch = self.env["hr.user.provision.batch"]._enqueue(
+            [
+                {
+                    "employee": employee,
+                    "login": employee.work_email,
+                    "password": "short" if index == 1 else "Queue-Passw0rd!",
+                    "roles": self.role_purchase,
+                }
+                for index, employee in enumerate(self.employees[1:3])
+            ]
+        )
+        refused = batch.request_ids.filtered(lambda request: request.state == "failed")
+        self.assertEqual(refused.employee_id, self.employees[2])
+        self.assertIn("cannot be used", refused.error)
+        self.assertFalse(refused.password_hash)
+
+        self.env["hr.user.provision.request"]._cron_process_requests()
+        self.assertTrue(self.employees[1].user_id)
+        self.assertFalse(self.employees[2].user_id)
+        self.assertEqual((batch.done_count, batch.failed_count), (1, 1))
+
+    def test_password_containing_login_fails_its_request(self):
+        employees = self.employees[1:3]
+        batch = self.env["hr.user.provision.batch"]._enqueue(
+            [
+                {
+                    "employee": employee,
+                    "login": employee.work_email,
+                    "password": "Queue1-Passw0rd!",
+                    "roles": self.role_purchase,
+                }
+                for employee in employees
+            ]
+        )
+        # queue1@example.com is refused, queue2@example.com is not
+        refused = batch.request_ids.filtered(lambda request: request.state == "failed")
+        self.assertEqual(refused.employee_id, employees[0])
+        self.assertIn("login", refused.error)
+        self.assertFalse(refused.password_hash)
+        self.assertTrue((batch.request_ids - refused).password_hash)
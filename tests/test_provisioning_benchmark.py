@@ -0,0 +1,191 @@
+import logging
+import os
+import time
+
+from odoo.tests import tagged
+
+from odoo.addons.user_management_module.models import res_users
+from odoo.addons.user_management_module.models.bulk_mode import (
+    deferred_cache_invalidation,
+)
+
+from .common import ProvisioningBenchmarkCase
+
+_logger = logging.getLogger(__name__)
+
+
+@tagged("post_install", "-at_install")
+class TestProvisioningBenchmark(ProvisioningBenchmarkCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.roles = cls.env.ref("user_management_module.role_sales") | cls.env.ref(
+            "user_management_module.role_purchase"
+        )
+        cls.employees = cls.env["hr.employee"].create(
+            [{"name": f"Benchmark Employee {index}"} for index in range(2)]
+        )
+        # Warm the role cache, it is not what is measured here
+        for code in cls.roles.mapped("code"):
+            cls.env["hr.user.role"]._get_group_ids_by_code(code)
+
+    def _legacy_create(self, employee, login):
+        """The create path before groups were passed at creation time"""
+        user = (
+            self.env["res.users"]
+            .sudo()
+            .create(
+                {
+                    "name": employee.name,
+                    "login": login,
+                    "email": login,
+                    "password": "x" * 12,
+                }
+            )
+        )
+        group_ids = set()
+        for code in self.roles.mapped("code"):
+            group_ids |= self.env["hr.user.role"]._get_group_ids_by_code(code)
+        user.sudo().write({"groups_id": [(6, 0, list(group_ids))]})
+        employee.sudo().write({"user_id": user.id})
+        employee.sudo().write({"x_user_role_ids": [(6, 0, self.roles.ids)]})
+
+    def test_single_write_create_path(self):
+        with self._measure("legacy_create_path") as legacy:
+            self._legacy_create(self.employees[0], "legacy@example.com")
+
+        with self._measure("single_write_create_path") as single_write:
+            self.env["hr.employee"]._provision_users(
+                [
+                    {
+                        "employee": self.employees[1],
+                        "login": "single@example.com",
+                        "password": "x" * 12,
+                        "roles": self.roles,
+                    }
+                ]
+            )
+
+        _logger.info(
+            "Create path per user: legacy %(queries)d queries, "
+            "%(cache_clears)d cache clears",
+            legacy,
+        )
+        _logger.info(
+            "Create path per user: single write %(queries)d queries, "
+            "%(cache_clears)d cache clears",
+            single_write,
+        )
+        self.assertLess(single_write["queries"], legacy["queries"])
+        self.assertLess(single_write["cache_clears"], legacy["cache_clears"])
+
+        user = self.employees[1].user_id
+        self.assertEqual(user.login, "single@example.com")
+        self.assertEqual(self.employees[1].x_user_role_ids, self.roles)
+        self.assertEqual(
+            user.groups_id & self.employees[0].user_id.groups_id, user.groups_id
+        )
+
+    def _provision_one_by_one(self, employees, stats):
+        """Provision the employees one at a time, as the per-record retry of
+        the queue does, timing after each one the access checks a concurrent
+        request would make"""
+        reader_seconds = 0.0
+        for employee in employees:
+            self.env["hr.employee"]._provision_users(
+                [
+                    {
+                        "employee": employee,
+                        "login": f"{employee.name.replace(' ', '.')}@example.com",
+                        "password": "x" * 12,
+                        "roles": self.roles,
+                    }
+                ]
+            )
+            start = time.perf_counter()
+            self.env.user.has_group("base.group_user")
+            self.env["ir.model.access"].check("res.partner", "read", False)
+            reader_seconds += time.perf_counter() - start
+        stats["reader_seconds"] = reader_seconds
+
+    def test_deferred_cache_invalidation(self):
+        employees = self.env["hr.employee"].create(
+            [{"name": f"Deferred Employee {index}"} for index in range(20)]
+        )
+
+        with self._measure("provision_immediate_invalidation") as immediate:
+            self._provision_one_by_one(employees[:10], immediate)
+
+        with self._measure("provision_deferred_invalidation") as deferred:
+            with deferred_cache_invalidation(self.env):
+                self._provision_one_by_one(employees[10:], deferred)
+
+        _logger.info(
+            "10 users one by one: immediate %(cache_clears)d cache clears, "
+            "access checks %(reader_seconds).4fs",
+            immediate,
+        )
+        _logger.info(
+            "10 users one by one: deferred %(cache_clears)d cache clears, "
+            "access checks %(reader_seconds).4fs",
+            deferred,
+        )
+        self.assertEqual(deferred["cache_clears"], 1)
+        self.assertGreater(immediate["cache_clears"], deferred["cache_clears"])
+        self.assertTrue(all(employees.mapped("user_id")))
+        # Restored once the block is left
+        self.assertNotIn("clear_cache", self.env.registry.__dict__)
+
+    def test_parallel_password_hashing(self):
+        passwords = [f"Hash-Passw0rd-{index}!" for index in range(16)]
+        Users = self.env["res.users"]
+
+        self.patch(res_users, "HASH_WORKERS", 1)
+        with self._measure("hash_passwords_serial") as serial:
+            serial_hashes = Users._hash_passwords(passwords)
+
+        self.patch(res_users, "HASH_WORKERS", 8)
+        with self._measure("hash_passwords_parallel") as parallel:
+            parallel_hashes = Users._hash_passwords(passwords)
+
+        _logger.info(
+            "Hashing %d passwords: serial %.3fs, parallel %.3fs on %d cores",
+            len(passwords),
+            serial["seconds"],
+            parallel["seconds"],
+            os.cpu_count() or 1,
+        )
+
+        crypt_context = Users._crypt_context()
+        for hashes in (serial_hashes, parallel_hashes):
+            self.assertEqual(set(hashes), set(passwords))
+            # Salted: no two passwords share a hash
+            self.assertEqual(len(set(hashes.values())), len(passwords))
+            for password, hashed in hashes.items():
+                self.assertTrue(crypt_context.verify(password, hashed))
+        for password in passwords:
+            self.assertNotEqual(serial_hashes[password], parallel_hashes[password])
+
+        # The stored hashes still verify once written back
+        users = Users.create(
+            [
+                {"name": f"Hash User {index}", "login": f"hash.user{index}@example.com"}
+                for index in range(2)
+            ]
+        )
+        Users._set_encrypted_passwords(
+            {
+                user.id: parallel_hashes[password]
+                for user, password in zip(users, passwords)
+            }
+        )
+        self.env.cr.execute(
+            "SELECT id, password FROM res_users WHERE id = ANY(%s)", [users.ids]
+        )
+        stored = dict(self.env.cr.fetchall())
+        for user, password in zip(users, passwords):
+            self.assertTrue(crypt_context.verify(password, stored[user.id]))
+
+        # Plaintext is refused, even with assertions disabled
+        with self.assertRaises(ValueError):
+            Users._set_encrypted_passwords({users[0].id: passwords[0]})
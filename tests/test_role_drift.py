@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from .common import create_provisioned_employees
+
+
+@tagged("post_install", "-at_install")
+class TestRoleDrift(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.employees, cls.users = create_provisioned_employees(
+            cls.env, "Drift", 4, cls.role_sales
+        )
+        # A group of another role, that the sales role does not imply
+        sales_groups = cls.role_sales.group_ids | cls.role_sales.group_ids.trans_implied_ids
+        role_purchase = cls.env.ref("user_management_module.role_purchase")
+        cls.extra_group = (role_purchase.group_ids - sales_groups)[:1]
+        cls.unmanaged_group = cls.env["res.groups"].create({"name": "Drift Unmanaged"})
+
+    def _drifted_user_ids(self):
+        __, drift = self.env["hr.employee"]._get_role_drift()
+        return {uid for user_ids in drift.values() for uid in user_ids}
+
+    def test_no_drift_after_provisioning(self):
+        checked, __ = self.env["hr.employee"]._get_role_drift()
+        self.assertGreaterEqual(checked, len(self.users))
+        self.assertFalse(set(self.users.ids) & self._drifted_user_ids())
+
+    def test_reconcile_drifted_users(self):
+        self.assertTrue(self.extra_group)
+        # Granted by hand, outside of the roles of the users
+        self.users[:2].write({"groups_id": [(4, self.extra_group.id)]})
+        # Granted by hand and managed by no role, left alone
+        self.users[3].write({"groups_id": [(4, self.unmanaged_group.id)]})
+        # Lost behind the back of the ORM
+        missing_group = (self.role_sales.group_ids - self.env.ref("base.group_user"))[:1]
+        self.env.flush_all()
+        self.env.cr.execute(
+            "DELETE FROM res_groups_users_rel WHERE uid = %s AND gid = %s",
+            [self.users[2].id, missing_group.id],
+        )
+        self.env.invalidate_all()
+
+        __, drift = self.env["hr.employee"]._get_role_drift()
+        self.assertEqual(drift.get(((), (self.extra_group.id,))), self.users[:2].ids)
+        self.assertEqual(drift.get(((missing_group.id,), ())), self.users[2].ids)
+
+        write_calls = []
+        Users = type(self.env["res.users"])
+        write = Users.write
+
+        def spy(users, vals):
+            write_calls.append(users.ids)
+            return write(users, vals)
+
+        with patch.object(Users, "write", spy):
+            report = self.env["hr.employee"]._cron_reconcile_role_groups()
+
+        self.assertEqual(report["drifted"], 3)
+        self.assertEqual(report["added"], 1)
+        self.assertEqual(report["removed"], 2)
+        # One write per distinct change, not per user
+        self.assertIn(self.users[:2].ids, write_calls)
+
+        self.assertEqual(report["failed"], 0)
+        self.assertIn(self.unmanaged_group, self.users[3].groups_id)
+        for user in self.users:
+            self.assertNotIn(self.extra_group, user.groups_id)
+            self.assertLessEqual(self.role_sales.group_ids, user.groups_id)
+        self.assertFalse(set(self.users.ids) & self._drifted_user_ids())
+
+    def test_reconcile_failure_is_isolated(self):
+        self.users[:2].write({"groups_id": [(4, self.extra_group.id)]})
+        missing_group = (self.role_sales.group_ids - self.env.ref("base.group_user"))[:1]
+        self.env.flush_all()
+        self.env.cr.execute(
+            "DELETE FROM res_groups_users_rel WHERE uid = %s AND gid = %s",
+            [self.users[2].id, missing_group.id],
+        )
+        self.env.invalidate_all()
+
+        Users = type(self.env["res.users"])
+        write = Users.write
+
+        def failing_write(users, vals):
+            if users.ids == self.users[:2].ids:
+                raise ValueError("Simulated failure")
+            return write(users, vals)
+
+        with patch.object(Users, "write", failing_write):
+            report = self.env["hr.employee"]._cron_reconcile_role_groups()
+
+        self.assertEqual(report["failed"], 2)
+        self.assertIn(self.extra_group, self.users[0].groups_id)
+        self.assertIn(missing_group, self.users[2].groups_id)
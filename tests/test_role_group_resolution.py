@@ -0,0 +1,124 @@
+from odoo.tests import TransactionCase, tagged
+
+# Cold resolution of the roles, whatever their number of rules:
+# - one query for the rule ids of the roles (rule_ids)
+# - one query for the fields of these rules
+# - one ir.model.data lookup for all XML IDs
+# plus one res.groups search per role
+ROLE_RESOLUTION_FIXED_QUERIES = 3
+ROLE_RESOLUTION_QUERY_BUDGET = ROLE_RESOLUTION_FIXED_QUERIES + 1
+
+
+@tagged("post_install", "-at_install")
+class TestRoleGroupResolution(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.Role = cls.env["hr.user.role"]
+        cls.roles = cls.Role.search([])
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+
+    def _resolve_rules_one_by_one(self, role):
+        """Reference implementation: one search or env.ref per rule"""
+        Groups = self.env["res.groups"].sudo().with_context(lang="en_US")
+        groups = self.env.ref("base.group_user")
+        for rule in role.rule_ids:
+            if rule.xmlid:
+                groups |= self.env.ref(rule.xmlid, raise_if_not_found=False) or Groups
+            else:
+                groups |= Groups.search(rule._get_groups_domain())
+        return groups
+
+    def test_precomputed_groups_match_per_rule_resolution(self):
+        self.Role._refresh_group_ids()
+        for role in self.roles:
+            with self.subTest(role=role.code):
+                self.assertEqual(role.group_ids, self._resolve_rules_one_by_one(role))
+
+    def test_resolution_query_budget(self):
+        self.env.invalidate_all()
+        with self.assertQueryCount(ROLE_RESOLUTION_QUERY_BUDGET):
+            self.role_sales._resolve_rule_group_ids()
+
+        self.env.invalidate_all()
+        with self.assertQueryCount(ROLE_RESOLUTION_FIXED_QUERIES + len(self.roles)):
+            self.roles._resolve_rule_group_ids()
+
+    def test_resolve_group_xmlids_single_query(self):
+        xmlids = [
+            "base.group_user",
+            "base.group_system",
+            "not_installed_module.group_user",
+            "malformed_xmlid",
+        ]
+        self.env.invalidate_all()
+        with self.assertQueryCount(1):
+            resolved = self.Role._resolve_group_xmlids(xmlids)
+        self.assertEqual(
+            resolved,
+            {
+                "base.group_user": self.env.ref("base.group_user").id,
+                "base.group_system": self.env.ref("base.group_system").id,
+            },
+        )
+
+    def test_resolve_group_xmlids_does_not_cross_match(self):
+        # module and name both exist, but not as this pair
+        resolved = self.Role._resolve_group_xmlids(
+            ["base.group_user", "hr.group_system"]
+        )
+        self.assertEqual(list(resolved), ["base.group_user"])
+
+    def test_base_user_group_always_included(self):
+        base_user = self.env.ref("base.group_user")
+        for role in self.roles:
+            with self.subTest(role=role.code):
+                self.assertIn(base_user, role.group_ids)
+
+    def test_group_ids_by_code_cached(self):
+        self.env.registry.clear_cache()
+        stats = self.Role._get_group_cache_stats()
+
+        group_ids = self.Role._get_group_ids_by_code("sales")
+        self.assertIsInstance(group_ids, frozenset)
+        self.assertEqual(group_ids, set(self.role_sales.group_ids.ids))
+
+        with self.assertQueryCount(0):
+            self.assertEqual(self.Role._get_group_ids_by_code("sales"), group_ids)
+
+        new_stats = self.Role._get_group_cache_stats()
+        self.assertEqual(new_stats["miss"] - stats["miss"], 1)
+        self.assertEqual(new_stats["hit"] - stats["hit"], 1)
+
+    def test_groups_recomputed_on_group_changes(self):
+        self.Role._get_group_ids_by_code("hr")
+        category = self.env["ir.module.category"].create({"name": "Unrelated"})
+        group = self.env["res.groups"].create(
+            {"name": "Officer", "category_id": category.id}
+        )
+        self.assertIn(group.id, self.Role._get_group_ids_by_code("hr"))
+
+        group.write({"name": "Not An HR Group Name"})
+        self.assertNotIn(group.id, self.Role._get_group_ids_by_code("hr"))
+
+    def test_new_role_from_rules_only(self):
+        role = self.Role.create(
+            {
+                "name": "Administrator",
+                "code": "test_admin",
+                "rule_ids": [(0, 0, {"xmlid": "base.group_system"})],
+            }
+        )
+        self.assertEqual(
+            role.group_ids,
+            self.env.ref("base.group_user") | self.env.ref("base.group_system"),
+        )
+        self.assertEqual(
+            self.Role._get_group_ids_by_code("test_admin"), set(role.group_ids.ids)
+        )
+
+        role.rule_ids = [(5, 0, 0), (0, 0, {"xmlid": "base.group_erp_manager"})]
+        self.assertIn(
+            self.env.ref("base.group_erp_manager").id,
+            self.Role._get_group_ids_by_code("test_admin"),
+        )
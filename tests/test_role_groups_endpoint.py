@@ -0,0 +1,52 @@
+from odoo.tests import HttpCase, new_test_user, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestRoleGroupsEndpoint(HttpCase):
+    def setUp(self):
+        super().setUp()
+        self.authenticate("admin", "admin")
+        self.roles = self.env.ref("user_management_module.role_sales") | self.env.ref(
+            "user_management_module.role_hr"
+        )
+
+    def _get(self, codes, etag=None):
+        headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+        return self.url_open(
+            f"/user_management/role_groups?codes={codes}", headers=headers
+        )
+
+    def test_preview_and_not_modified(self):
+        response = self._get("sales,hr")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            {group["id"] for group in data["groups"]}, set(self.roles.group_ids.ids)
+        )
+        self.assertEqual(
+            data["roles"]["sales"],
+            sorted(self.env.ref("user_management_module.role_sales").group_ids.ids),
+        )
+
+        etag = response.headers["ETag"].strip('"')
+        # Same set of roles, whatever the order
+        response = self._get("hr, sales", etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertFalse(response.content)
+
+    def test_etag_changes_with_groups(self):
+        etag = self._get("sales").headers["ETag"].strip('"')
+
+        group = self.env.ref("user_management_module.role_sales").group_ids[-1:]
+        group.name = f"{group.name} (renamed)"
+        self.env.flush_all()
+
+        response = self._get("sales", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"].strip('"'), etag)
+
+    def test_portal_users_refused(self):
+        new_test_user(self.env, login="role.portal", groups="base.group_portal")
+        self.authenticate("role.portal", "role.portal")
+        response = self._get("sales")
+        self.assertEqual(response.status_code, 403)
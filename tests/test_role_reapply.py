@@ -0,0 +1,89 @@
+from odoo.tests import TransactionCase, tagged
+
+from .common import create_provisioned_employees
+
+
+@tagged("post_install", "-at_install")
+class TestRoleReapply(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.role_purchase = cls.env.ref("user_management_module.role_purchase")
+        roles = [cls.role_sales, cls.role_sales, cls.role_sales | cls.role_purchase]
+        cls.employees, cls.users = create_provisioned_employees(
+            cls.env, "Reapply", 3, roles
+        )
+        cls.new_group = cls.env["res.groups"].create({"name": "Reapply New"})
+        cls.shared_group = cls.env["res.groups"].create({"name": "Reapply Shared"})
+
+    def test_reapply_added_group(self):
+        self.role_sales.rule_ids = [(0, 0, {"group_names": "Reapply New"})]
+        result = self.role_sales._reapply_groups()
+
+        self.assertEqual(result, {"users": 3, "added": 1, "removed": 0})
+        for user in self.users:
+            self.assertIn(self.new_group, user.groups_id)
+        self.assertEqual(self.role_sales.applied_group_ids, self.role_sales.group_ids)
+
+        # Nothing changed since
+        self.assertEqual(self.role_sales._reapply_groups()["users"], 0)
+
+    def test_reapply_removed_group_kept_by_other_role(self):
+        rule = {"group_names": "Reapply Shared"}
+        self.role_sales.rule_ids = [(0, 0, rule)]
+        self.role_purchase.rule_ids = [(0, 0, rule)]
+        for role in self.role_sales | self.role_purchase:
+            role._reapply_groups()
+        for user in self.users:
+            self.assertIn(self.shared_group, user.groups_id)
+
+        self.role_sales.rule_ids.filtered(
+            lambda rule: rule.group_names == "Reapply Shared"
+        ).unlink()
+        result = self.role_sales._reapply_groups()
+
+        self.assertEqual(result["removed"], 1)
+        self.assertNotIn(self.shared_group, self.users[0].groups_id)
+        self.assertNotIn(self.shared_group, self.users[1].groups_id)
+        # Still granted by the purchase role
+        self.assertIn(self.shared_group, self.users[2].groups_id)
+
+    def test_applied_groups_snapshot_at_creation(self):
+        for role in self.role_sales | self.role_purchase:
+            self.assertEqual(role.applied_group_ids, role.group_ids)
+
+        role = self.env["hr.user.role"].create(
+            {
+                "name": "Reapply Snapshot",
+                "code": "reapply_snapshot",
+                "rule_ids": [(0, 0, {"group_names": "Reapply Shared"})],
+            }
+        )
+        self.assertIn(self.shared_group, role.applied_group_ids)
+        self.assertEqual(role.applied_group_ids, role.group_ids)
+
+    def test_first_reapply_applies_only_the_change(self):
+        role = self.env["hr.user.role"].create(
+            {
+                "name": "Reapply First",
+                "code": "reapply_first",
+                "rule_ids": [
+                    (0, 0, {"group_names": "Reapply Shared"}),
+                    (0, 0, {"group_names": "Reapply New"}),
+                ],
+            }
+        )
+        __, users = create_provisioned_employees(self.env, "First", 2, role)
+        # Taken away from one holder on purpose
+        users[0].write({"groups_id": [(3, self.new_group.id)]})
+
+        role.rule_ids.filtered(lambda rule: rule.group_names == "Reapply Shared").unlink()
+        result = role._reapply_groups()
+
+        self.assertEqual((result["added"], result["removed"]), (0, 1))
+        for user in users:
+            self.assertNotIn(self.shared_group, user.groups_id)
+        # Not given back, only the change of the role is applied
+        self.assertNotIn(self.new_group, users[0].groups_id)
+        self.assertIn(self.new_group, users[1].groups_id)
@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from odoo.tests import TransactionCase, tagged
+
+from .common import provision_users
+
+
+@tagged("post_install", "-at_install")
+class TestUpdateUser(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.role_purchase = cls.env.ref("user_management_module.role_purchase")
+        cls.employee = cls.env["hr.employee"].create(
+            {"name": "Updated Employee", "work_email": "updated@example.com"}
+        )
+        provision_users(cls.env, cls.employee, cls.role_sales)
+        cls.user = cls.employee.user_id
+
+    def _update(self, roles):
+        wizard = (
+            self.env["hr.create.user.wizard"]
+            .with_context(default_employee_id=self.employee.id)
+            .create({"user_role_ids": [(6, 0, roles.ids)]})
+        )
+        self.assertTrue(wizard.is_update_mode)
+        return wizard.action_create_user()
+
+    def test_unchanged_roles_skip_group_write(self):
+        ResUsers = type(self.env["res.users"])
+        with patch.object(
+            ResUsers, "write", autospec=True, side_effect=ResUsers.write
+        ) as write:
+            self._update(self.role_sales)
+        self.assertFalse(
+            [call for call in write.call_args_list if "groups_id" in call.args[1]]
+        )
+
+    def test_diff_matches_replace(self):
+        roles = self.role_purchase
+        group_ids = self.env["hr.create.user.wizard"]._get_groups_for_roles(
+            roles.mapped("code")
+        )
+        expected_user = self.env["res.users"].create(
+            {"name": "Reference", "login": "reference@example.com"}
+        )
+        expected_user.groups_id = [(6, 0, group_ids)]
+
+        self._update(roles)
+        self.assertEqual(self.user.groups_id, expected_user.groups_id)
+        self.assertEqual(self.employee.x_user_role_ids, roles)
+        self.assertFalse(self.user._get_groups_diff_commands(group_ids))
@@ -0,0 +1,90 @@
+import base64
+
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged("post_install", "-at_install")
+class TestUserImport(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.role_purchase = cls.env.ref("user_management_module.role_purchase")
+        cls.role_warehouse = cls.env.ref("user_management_module.role_warehouse")
+        cls.employees = cls.env["hr.employee"].create(
+            [
+                {
+                    "name": f"Imported Employee {index}",
+                    "work_email": f"import{index}@example.com",
+                    "barcode": f"IMP{index:04d}",
+                }
+                for index in range(3)
+            ]
+        )
+
+    def _import(self, content, **values):
+        wizard = self.env["hr.user.import.wizard"].create(
+            {
+                "file": base64.b64encode(content.encode()),
+                "filename": "new_hires.csv",
+                "password": "Import-Passw0rd!",
+                **values,
+            }
+        )
+        action = wizard.action_import()
+        return self.env["hr.user.provision.batch"].browse(action["res_id"])
+
+    def test_import_csv_in_chunks(self):
+        batch = self._import(
+            "barcode,roles,login\n"
+            "IMP0000,purchase,\n"
+            "IMP0001,purchase;warehouse,imported.one@example.com\n"
+            "UNKNOWN,purchase,\n"
+            "IMP0002,nope,\n",
+            match_key="barcode",
+            chunk_size=2,
+        )
+        self.assertEqual(batch.total_count, 2)
+        self.assertIn("2 rows skipped.", batch.note)
+        self.assertIn("Row 4:", batch.note)
+        self.assertIn("Row 5:", batch.note)
+
+        requests = batch.request_ids
+        self.assertEqual(requests.employee_id, self.employees[:2])
+        self.assertEqual(requests[0].login, self.employees[0].work_email)
+        self.assertEqual(requests[1].login, "imported.one@example.com")
+        self.assertEqual(requests[1].role_ids, self.role_purchase | self.role_warehouse)
+
+        self.env["hr.user.provision.request"]._cron_process_requests()
+        self.assertEqual(self.employees[1].user_id.login, "imported.one@example.com")
+
+    def test_chunk_matching_single_query(self):
+        rows = [
+            {"work_email": employee.work_email, "roles": "purchase"}
+            for employee in self.employees
+        ]
+        roles_by_code = {"purchase": self.role_purchase}
+        password_hash = self.env["res.users"]._hash_passwords(["Import-Passw0rd!"])[
+            "Import-Passw0rd!"
+        ]
+        self.env.invalidate_all()
+        with self.assertQueryCount(1):
+            entries, problems = self.env["hr.user.import.wizard"]._prepare_entries(
+                rows, "work_email", roles_by_code, password_hash, 2
+            )
+        self.assertEqual(len(entries), 3)
+        self.assertFalse(problems)
+        self.assertEqual({entry["password_hash"] for entry in entries}, {password_hash})
+
+    def test_refused_row_password_skips_the_row(self):
+        batch = self._import(
+            "barcode,roles,password\n"
+            "IMP0000,purchase,\n"
+            "IMP0001,purchase,short\n"
+            "IMP0002,purchase,Row-Passw0rd!\n",
+            match_key="barcode",
+        )
+        self.assertEqual(batch.total_count, 2)
+        self.assertIn("Row 3: password refused.", batch.note)
+        self.assertEqual(
+            batch.request_ids.employee_id, self.employees[0] | self.employees[2]
+        )
@@ -0,0 +1,124 @@
+import base64
+
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+PASSWORD = "Wizard-Passw0rd!"
+
+
+@tagged("post_install", "-at_install")
+class TestWizardCredentials(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employee = cls.env["hr.employee"].create({"name": "Credential Employee"})
+        cls.role_sales = cls.env.ref("user_management_module.role_sales")
+        cls.Wizard = cls.env["hr.create.user.wizard"]
+
+    def _create_wizard(self, password=PASSWORD, confirm_password=PASSWORD):
+        return self.Wizard.create(
+            {
+                "employee_id": self.employee.id,
+                "login": "credential@example.com",
+                "password": password,
+                "confirm_password": confirm_password,
+                "user_role_ids": [(6, 0, self.role_sales.ids)],
+            }
+        )
+
+    def test_plaintext_never_stored(self):
+        wizard = self._create_wizard()
+        self.env.flush_all()
+        self.env.cr.execute(
+            "SELECT * FROM hr_create_user_wizard WHERE id = %s", [wizard.id]
+        )
+        row = self.env.cr.dictfetchone()
+        self.assertNotIn("password", row)
+        self.assertNotIn("confirm_password", row)
+        self.assertNotIn(PASSWORD, [str(value) for value in row.values()])
+        self.assertEqual(row["password_status"], "ok")
+
+        self.env.invalidate_all()
+        self.assertFalse(wizard.password)
+
+        wizard.action_create_user()
+        self.assertFalse(wizard.exists())
+
+        user = self.employee.user_id
+        self.env.cr.execute("SELECT password FROM res_users WHERE id = %s", [user.id])
+        [stored] = self.env.cr.fetchone()
+        self.assertTrue(self.env["res.users"]._crypt_context().verify(PASSWORD, stored))
+
+    def test_confirmation_checked(self):
+        wizard = self._create_wizard(confirm_password="Other-Passw0rd!")
+        self.assertEqual(wizard.password_status, "mismatch")
+        with self.assertRaisesRegex(UserError, "do not match"):
+            wizard.action_create_user()
+
+        wizard = self._create_wizard(confirm_password=False)
+        with self.assertRaisesRegex(UserError, "required"):
+            wizard.action_create_user()
+        self.assertFalse(self.employee.user_id)
+
+    def _stored_row(self, wizard):
+        self.env.flush_all()
+        self.env.cr.execute(f"SELECT * FROM {wizard._table} WHERE id = %s", [wizard.id])
+        row = self.env.cr.dictfetchone()
+        self.assertNotIn("password", row)
+        self.assertNotIn(PASSWORD, [str(value) for value in row.values()])
+        return row
+
+    def test_bulk_wizard_plaintext_never_stored(self):
+        self.employee.work_email = "bulk.credential@example.com"
+        wizard = self.env["hr.bulk.create.user.wizard"].create(
+            {
+                "employee_ids": [(6, 0, self.employee.ids)],
+                "password": PASSWORD,
+                "confirm_password": PASSWORD,
+                "user_role_ids": [(6, 0, self.role_sales.ids)],
+            }
+        )
+        self.assertEqual(self._stored_row(wizard)["password_status"], "ok")
+
+        wizard.action_create_users()
+        self.assertFalse(wizard.exists())
+        self.env.cr.execute(
+            "SELECT password FROM res_users WHERE id = %s", [self.employee.user_id.id]
+        )
+        [stored] = self.env.cr.fetchone()
+        self.assertTrue(self.env["res.users"]._crypt_context().verify(PASSWORD, stored))
+
+    def test_import_wizard_default_password_hashed(self):
+        self.employee.work_email = "import.credential@example.com"
+        wizard = self.env["hr.user.import.wizard"].create(
+            {
+                "file": base64.b64encode(
+                    b"work_email,roles\nimport.credential@example.com,sales\n"
+                ),
+                "filename": "credentials.csv",
+                "password": PASSWORD,
+            }
+        )
+        row = self._stored_row(wizard)
+        self.assertTrue(
+            self.env["res.users"]._crypt_context().verify(PASSWORD, row["password_hash"])
+        )
+
+        attachment_domain = [
+            ("res_model", "=", wizard._name),
+            ("res_field", "=", "file"),
+            ("res_id", "=", wizard.id),
+        ]
+        self.assertTrue(self.env["ir.attachment"].sudo().search(attachment_domain))
+
+        action = wizard.action_import()
+        request = self.env["hr.user.provision.batch"].browse(action["res_id"]).request_ids
+        self.assertEqual(request.password_hash, row["password_hash"])
+        # The uploaded file goes away with the wizard
+        self.assertFalse(wizard.exists())
+        self.assertFalse(self.env["ir.attachment"].sudo().search(attachment_domain))
+
+        with self.assertRaises(UserError):
+            self.env["hr.user.import.wizard"].create(
+                {"file": base64.b64encode(b"work_email,roles\n"), "password": "short"}
+            )